@@ -0,0 +1,15 @@
+from django.conf import settings
+from rest_framework.pagination import CursorPagination
+
+
+class PostCursorPagination(CursorPagination):
+    """ Курсор по полям сортировки ленты, без подсчета всех строк """
+    ordering = ('-pub_date', '-id')
+
+    def get_page_size(self, request):
+        return settings.POSTS_FOR_PAGE
+
+    def get_ordering(self, request, queryset, view):
+        # лента подписок сортируется по полям своих записей, чтобы
+        # читать их индекс по порядку; остальные ленты - как модель
+        return tuple(queryset.query.order_by) or self.ordering
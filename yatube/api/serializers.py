@@ -0,0 +1,32 @@
+from django.conf import settings
+from rest_framework import serializers
+
+from posts.models import Post
+
+
+class PostSerializer(serializers.ModelSerializer):
+    """ Пост ленты; автор и группа берутся из select_related """
+    author = serializers.SlugRelatedField(
+        slug_field='username', read_only=True
+    )
+    group = serializers.SlugRelatedField(slug_field='slug', read_only=True)
+
+    class Meta:
+        model = Post
+        fields = (
+            'id', 'text', 'pub_date', 'author', 'group', 'image',
+            'comment_count',
+        )
+        read_only_fields = fields
+
+
+class BulkFollowSerializer(serializers.Serializer):
+    """ Имена авторов, на которых подписаться и от которых отписаться """
+    follow = serializers.ListField(
+        child=serializers.CharField(), default=list,
+        max_length=settings.FOLLOW_BULK_LIMIT
+    )
+    unfollow = serializers.ListField(
+        child=serializers.CharField(), default=list,
+        max_length=settings.FOLLOW_BULK_LIMIT
+    )
@@ -0,0 +1,115 @@
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Follow, Group, Post, User
+from posts.tests.utils import commit_callbacks
+
+
+class FeedApiTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Test_api_author')
+        cls.user = User.objects.create_user(username='Test_api_user')
+        cls.group = Group.objects.create(
+            title='Test_api_group', slug='test_api_group'
+        )
+        for number in range(3):
+            Post.objects.create(
+                text=f'Post {number}',
+                author=cls.author,
+                group=cls.group if number else None
+            )
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.authorized_user = Client()
+        self.authorized_user.force_login(self.__class__.user)
+
+    def get_texts(self, response):
+        return [post['text'] for post in response.json()['results']]
+
+    @override_settings(POSTS_FOR_PAGE=2)
+    def test_posts_walk_with_cursor(self):
+        """ Лента отдается страницами по курсору, с автором и группой """
+        response = self.client.get(reverse('api:posts'))
+        data = response.json()
+        self.assertEqual(self.get_texts(response), ['Post 2', 'Post 1'])
+        self.assertEqual(data['results'][0]['author'], 'Test_api_author')
+        self.assertEqual(data['results'][0]['group'], 'test_api_group')
+        response = self.client.get(data['next'])
+        self.assertEqual(self.get_texts(response), ['Post 0'])
+        self.assertIsNone(response.json()['next'])
+
+    def test_group_and_user_posts(self):
+        """ Ленты группы и автора содержат только свои посты """
+        response = self.client.get(
+            reverse('api:group_posts', args=['test_api_group'])
+        )
+        self.assertEqual(self.get_texts(response), ['Post 2', 'Post 1'])
+        response = self.client.get(
+            reverse('api:user_posts', args=['Test_api_author'])
+        )
+        self.assertEqual(len(self.get_texts(response)), 3)
+        response = self.client.get(reverse('api:group_posts', args=['none']))
+        self.assertEqual(response.status_code, 404)
+
+    def test_follow_feed(self):
+        """ Лента подписок доступна только пользователю и меняется
+        при подписке """
+        response = self.client.get(reverse('api:follow'))
+        self.assertIn(response.status_code, (401, 403))
+        response = self.authorized_user.get(reverse('api:follow'))
+        self.assertEqual(self.get_texts(response), [])
+        with commit_callbacks():
+            Follow.objects.create(
+                user=self.__class__.user, author=self.__class__.author
+            )
+        response = self.authorized_user.get(reverse('api:follow'))
+        self.assertEqual(len(self.get_texts(response)), 3)
+
+    def test_conditional_get_served_from_cache(self):
+        """ Совпавший ETag дает 304 без запросов к базе, новый пост
+        меняет ETag """
+        response = self.client.get(reverse('api:posts'))
+        etag = response['ETag']
+        self.assertTrue(response.has_header('Last-Modified'))
+        with self.assertNumQueries(0):
+            response = self.client.get(
+                reverse('api:posts'), HTTP_IF_NONE_MATCH=etag
+            )
+        self.assertEqual(response.status_code, 304)
+        with commit_callbacks():
+            Post.objects.create(text='Post 3', author=self.__class__.author)
+        response = self.client.get(
+            reverse('api:posts'), HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(self.get_texts(response)[0], 'Post 3')
+
+    def test_bulk_follow(self):
+        """ Массовая подписка идемпотентна и сообщает о неизвестных """
+        url = reverse('api:follow_bulk')
+        data = {'follow': ['Test_api_author', 'nobody'], 'unfollow': []}
+        response = self.authorized_user.post(
+            url, data, content_type='application/json'
+        )
+        self.assertEqual(response.json(), {
+            'followed': ['Test_api_author'],
+            'unfollowed': [],
+            'unknown': ['nobody'],
+        })
+        response = self.authorized_user.post(
+            url, data, content_type='application/json'
+        )
+        self.assertEqual(response.json()['followed'], [])
+        response = self.authorized_user.post(
+            url, {'unfollow': ['Test_api_author']},
+            content_type='application/json'
+        )
+        self.assertEqual(response.json()['unfollowed'], ['Test_api_author'])
+        self.assertFalse(Follow.objects.exists())
@@ -0,0 +1,21 @@
+from django.urls import path
+
+from . import views
+
+app_name = 'api'
+
+urlpatterns = [
+    path('v1/posts/', views.PostList.as_view(), name='posts'),
+    path(
+        'v1/groups/<slug:slug>/posts/',
+        views.GroupPostList.as_view(),
+        name='group_posts'
+    ),
+    path(
+        'v1/users/<str:username>/posts/',
+        views.UserPostList.as_view(),
+        name='user_posts'
+    ),
+    path('v1/follow/', views.FollowPostList.as_view(), name='follow'),
+    path('v1/follow/bulk/', views.BulkFollow.as_view(), name='follow_bulk'),
+]
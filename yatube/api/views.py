@@ -0,0 +1,131 @@
+import hashlib
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from django.utils.timezone import now
+from rest_framework.generics import ListAPIView
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from posts.caching import (follow_version_key, get_group, get_index_version,
+                           get_version)
+from posts.follows import follow_authors, unfollow_authors
+from posts.models import Post
+from posts.timeline import timeline_posts
+
+from .pagination import PostCursorPagination
+from .serializers import BulkFollowSerializer, PostSerializer
+
+
+class CachedFeedView(ListAPIView):
+    """ Страница ленты из кэша с валидаторами ETag и Last-Modified.
+
+    Ключ кэша включает версии, которые сбрасываются при изменении
+    данных ленты, поэтому совпавший валидатор дает 304 без запросов
+    к базе. Last-Modified - время, когда страница была собрана.
+    """
+    serializer_class = PostSerializer
+    pagination_class = PostCursorPagination
+
+    def cache_key_parts(self):
+        return [get_index_version()]
+
+    def cache_key(self, request):
+        url = hashlib.md5(request.build_absolute_uri().encode()).hexdigest()
+        parts = ':'.join(str(part) for part in self.cache_key_parts())
+        return f'api:{parts}:{url}'
+
+    def list(self, request, *args, **kwargs):
+        key = self.cache_key(request)
+        entry = cache.get(key)
+        if entry is None:
+            data = super().list(request, *args, **kwargs).data
+            entry = {
+                'data': data,
+                'etag': quote_etag(
+                    hashlib.md5(JSONRenderer().render(data)).hexdigest()
+                ),
+                'last_modified': int(now().timestamp()),
+            }
+            cache.set(key, entry, timeout=settings.INDEX_PAGE_CACHE_TIMEOUT)
+        response = get_conditional_response(
+            request,
+            etag=entry['etag'],
+            last_modified=entry['last_modified']
+        )
+        if response is None:
+            response = Response(entry['data'])
+        response['ETag'] = entry['etag']
+        response['Last-Modified'] = http_date(entry['last_modified'])
+        return response
+
+
+class PostList(CachedFeedView):
+    def get_queryset(self):
+        return Post.objects.for_feed()
+
+
+class GroupPostList(CachedFeedView):
+    def get_queryset(self):
+        group = get_group(self.kwargs['slug'])
+        return group.posts_relate.for_feed()
+
+
+class UserPostList(CachedFeedView):
+    def get_queryset(self):
+        author = get_object_or_404(User, username=self.kwargs['username'])
+        return author.posts_relate.for_feed()
+
+
+class FollowPostList(CachedFeedView):
+    permission_classes = (IsAuthenticated,)
+
+    def cache_key_parts(self):
+        user_id = self.request.user.pk
+        return [
+            get_index_version(),
+            user_id,
+            get_version(follow_version_key(user_id)),
+        ]
+
+    def get_queryset(self):
+        return timeline_posts(self.request.user)
+
+
+class BulkFollow(APIView):
+    """ Подписки и отписки списком за один запрос.
+
+    Повтор запроса ничего не меняет: уже существующие подписки
+    пропускаются, отсутствующие - не удаляются.
+    """
+    permission_classes = (IsAuthenticated,)
+
+    def post(self, request):
+        serializer = BulkFollowSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        names = serializer.validated_data
+        users = User.objects.filter(
+            username__in=set(names['follow']) | set(names['unfollow'])
+        ).in_bulk(field_name='username')
+        followed = follow_authors(request.user, [
+            users[name] for name in names['follow'] if name in users
+        ])
+        unfollowed = set(unfollow_authors(request.user, [
+            users[name].pk for name in names['unfollow'] if name in users
+        ]))
+        return Response({
+            'followed': [author.username for author in followed],
+            'unfollowed': [
+                name for name in names['unfollow']
+                if name in users and users[name].pk in unfollowed
+            ],
+            'unknown': sorted(
+                (set(names['follow']) | set(names['unfollow'])) - set(users)
+            ),
+        })
@@ -0,0 +1,65 @@
+import random
+
+from django.core.files.base import ContentFile
+from mixer.backend.django import mixer
+
+from posts.models import Follow, Group, Post, User
+from posts.storage import post_image_storage
+
+# картинка 2x1 пикселя: хранилище по хэшу держит ее в одном файле
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
+
+class Dataset:
+    """ Созданные для замеров объекты """
+
+    def __init__(self, users, groups, posts):
+        self.users = users
+        self.groups = groups
+        self.posts = posts
+
+
+def seed_dataset(users=50, posts=1000, groups=10, follow_density=0.1,
+                 image_ratio=0.2, seed=0):
+    """ Заполняет базу одинаковыми при одном seed данными.
+
+    Объекты создаются по одному, чтобы сигналы заполнили счетчики,
+    ленты подписок и поисковый индекс так же, как в работе.
+    """
+    rng = random.Random(seed)
+    mixer.faker.seed_instance(seed)
+    image = post_image_storage.save('posts/bench.gif', ContentFile(SMALL_GIF))
+
+    authors = [
+        mixer.blend(User, username=f'bench_user_{number}')
+        for number in range(users)
+    ]
+    group_list = [
+        mixer.blend(
+            Group, title=f'Bench group {number}', slug=f'bench-{number}'
+        )
+        for number in range(groups)
+    ]
+    post_list = [
+        mixer.blend(
+            Post,
+            text=mixer.faker.text(280),
+            author=rng.choice(authors),
+            group=rng.choice(group_list) if group_list else None,
+            image=image if rng.random() < image_ratio else '',
+        )
+        for _ in range(posts)
+    ]
+    following = max(1, int(users * follow_density))
+    for user in authors:
+        others = [author for author in authors if author != user]
+        for author in rng.sample(others, min(following, len(others))):
+            Follow.objects.create(user=user, author=author)
+    return Dataset(authors, group_list, post_list)
@@ -0,0 +1,177 @@
+import json
+import os
+import platform
+import shutil
+import subprocess
+import tempfile
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import (override_settings, setup_test_environment,
+                               teardown_test_environment)
+
+from benchmarks.dataset import seed_dataset
+from benchmarks.scenarios import SCENARIOS, run_scenario
+
+
+def isolated_caches(directory):
+    """ Те же кэши, но в своем месте: файловый кэш сервера не трогаем """
+    return {
+        alias: dict(config, LOCATION=os.path.join(directory, f'{alias}.cache'))
+        for alias, config in settings.CACHES.items()
+    }
+
+
+def git_commit():
+    try:
+        result = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=settings.BASE_DIR, capture_output=True, text=True, check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+
+def regressions(report, baseline, tolerance):
+    """ Сценарии, где p95 или число запросов хуже базового отчета """
+    found = []
+    for name, result in report['scenarios'].items():
+        base = baseline.get('scenarios', {}).get(name)
+        if base is None:
+            continue
+        if result['p95_ms'] > base['p95_ms'] * (1 + tolerance):
+            found.append(
+                f"{name}: p95 {result['p95_ms']} мс, было {base['p95_ms']}"
+            )
+        if result['queries_per_request'] > base['queries_per_request']:
+            found.append(
+                f"{name}: запросов {result['queries_per_request']}, "
+                f"было {base['queries_per_request']}"
+            )
+    return found
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет представления posts на сгенерированных данных '
+        'в отдельной тестовой базе и выводит отчет в JSON'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=50)
+        parser.add_argument('--posts', type=int, default=1000)
+        parser.add_argument('--groups', type=int, default=10)
+        parser.add_argument(
+            '--follow-density', type=float, default=0.1,
+            help='Доля авторов, на которых подписан каждый пользователь'
+        )
+        parser.add_argument(
+            '--image-ratio', type=float, default=0.2,
+            help='Доля постов с картинкой'
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--requests', type=int, default=50,
+            help='Запросов на сценарий'
+        )
+        parser.add_argument('--warmup', type=int, default=5)
+        parser.add_argument(
+            '--scenario', action='append', choices=sorted(SCENARIOS),
+            help='Сценарий; по умолчанию все'
+        )
+        parser.add_argument(
+            '--file-db', action='store_true',
+            help='Тестовая база SQLite в файле, а не в памяти: так '
+                 'сказываются журнал и PRAGMA настроек'
+        )
+        parser.add_argument('--output', help='Файл для отчета')
+        parser.add_argument(
+            '--baseline',
+            help='Отчет прошлого запуска: при ухудшении команда падает'
+        )
+        parser.add_argument(
+            '--tolerance', type=float, default=0.2,
+            help='Допустимый рост p95 относительно базового отчета'
+        )
+
+    def run_scenarios(self, dataset_options, media_root, options):
+        with override_settings(
+            DEBUG=False, MEDIA_ROOT=media_root, CACHES=isolated_caches(
+                media_root
+            )
+        ):
+            dataset = seed_dataset(**dataset_options)
+            return {
+                name: run_scenario(
+                    name,
+                    dataset,
+                    requests=options['requests'],
+                    warmup=options['warmup'],
+                    seed=options['seed']
+                )
+                for name in options['scenario'] or SCENARIOS
+            }
+
+    def handle(self, *args, **options):
+        dataset_options = {
+            'users': options['users'],
+            'posts': options['posts'],
+            'groups': options['groups'],
+            'follow_density': options['follow_density'],
+            'image_ratio': options['image_ratio'],
+            'seed': options['seed'],
+        }
+        media_root = tempfile.mkdtemp()
+        database = connection.settings_dict
+        saved_database = {
+            'NAME': database['NAME'], 'TEST': dict(database['TEST'])
+        }
+        # до создания тестовой базы и после ее удаления соединение
+        # смотрит во временный каталог: рабочая база не открывается
+        # и пустой файл рядом с проектом не появляется
+        database['NAME'] = os.path.join(media_root, 'unused.sqlite3')
+        if options['file_db']:
+            database['TEST']['NAME'] = os.path.join(
+                media_root, 'benchmark.sqlite3'
+            )
+        setup_test_environment()
+        try:
+            connection.creation.create_test_db(verbosity=0, autoclobber=True)
+            try:
+                scenarios = self.run_scenarios(
+                    dataset_options, media_root, options
+                )
+            finally:
+                connection.creation.destroy_test_db(
+                    os.path.join(media_root, 'unused.sqlite3'), verbosity=0
+                )
+        finally:
+            database.update(saved_database)
+            settings.DATABASES[connection.alias]['NAME'] = database['NAME']
+            teardown_test_environment()
+            shutil.rmtree(media_root, ignore_errors=True)
+
+        report = {
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'settings': settings.SETTINGS_MODULE,
+            'dataset': dataset_options,
+            'scenarios': scenarios,
+        }
+        text = json.dumps(report, ensure_ascii=False, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                output.write(text + '\n')
+        else:
+            self.stdout.write(text)
+
+        if options['baseline']:
+            with open(options['baseline']) as baseline:
+                found = regressions(report, json.load(baseline),
+                                    options['tolerance'])
+            if found:
+                raise CommandError('Регрессия: ' + '; '.join(found))
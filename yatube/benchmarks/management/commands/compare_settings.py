@@ -0,0 +1,83 @@
+import json
+import os
+import secrets
+import statistics
+import subprocess
+import sys
+import tempfile
+from time import perf_counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+STARTUP_CODE = (
+    'from django.core.wsgi import get_wsgi_application; '
+    'get_wsgi_application()'
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает время запуска и запросов с настройками разработки '
+        'и сервера; каждый профиль запускается в отдельном процессе'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--settings-module', action='append', dest='modules',
+            help='Модуль настроек; по умолчанию разработка и сервер'
+        )
+        parser.add_argument('--startup-runs', type=int, default=5)
+        parser.add_argument('--requests', type=int, default=50)
+        parser.add_argument('--users', type=int, default=50)
+        parser.add_argument('--posts', type=int, default=1000)
+        parser.add_argument('--output', help='Файл для отчета')
+
+    def run(self, args, module, **kwargs):
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=module)
+        env.pop('YATUBE_ENV', None)
+        # серверный профиль без ключа не стартует; для замеров хватит
+        # одноразового
+        env.setdefault('DJANGO_SECRET_KEY', secrets.token_urlsafe(50))
+        return subprocess.run(
+            [sys.executable, *args], cwd=settings.BASE_DIR, env=env,
+            check=True, stdout=subprocess.DEVNULL, **kwargs
+        )
+
+    def startup_ms(self, module):
+        start = perf_counter()
+        self.run(['-c', STARTUP_CODE], module)
+        return (perf_counter() - start) * 1000
+
+    def handle(self, *args, **options):
+        modules = options['modules'] or [
+            'yatube.settings', 'yatube.settings_production'
+        ]
+        report = {}
+        for module in modules:
+            startup = [
+                self.startup_ms(module)
+                for _ in range(options['startup_runs'])
+            ]
+            with tempfile.TemporaryDirectory() as directory:
+                output = os.path.join(directory, 'report.json')
+                self.run([
+                    'manage.py', 'benchmark', '--file-db',
+                    '--requests', str(options['requests']),
+                    '--users', str(options['users']),
+                    '--posts', str(options['posts']),
+                    '--output', output,
+                ], module)
+                with open(output) as result:
+                    scenarios = json.load(result)['scenarios']
+            report[module] = {
+                'startup_ms': round(statistics.median(startup), 1),
+                'scenarios': scenarios,
+            }
+
+        text = json.dumps(report, ensure_ascii=False, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                output.write(text + '\n')
+        else:
+            self.stdout.write(text)
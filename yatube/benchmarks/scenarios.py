@@ -0,0 +1,126 @@
+import gc
+import random
+import statistics
+import tracemalloc
+from time import perf_counter
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+
+def read(url):
+    return lambda client: client.get(url)
+
+
+def write(url, data):
+    return lambda client: client.post(url, data)
+
+
+def index(dataset, rng):
+    pages = max(1, len(dataset.posts) // 10)
+    return read(f"{reverse('index')}?page={rng.randint(1, pages)}")
+
+
+def group_posts(dataset, rng):
+    return read(reverse('group_posts', args=[rng.choice(dataset.groups).slug]))
+
+
+def profile(dataset, rng):
+    return read(reverse('profile', args=[rng.choice(dataset.users).username]))
+
+
+def post_view(dataset, rng):
+    post = rng.choice(dataset.posts)
+    return read(reverse('post', args=[post.author.username, post.id]))
+
+
+def follow_index(dataset, rng):
+    return read(reverse('follow_index'))
+
+
+def add_comment(dataset, rng):
+    post = rng.choice(dataset.posts)
+    return write(
+        reverse('add_comment', args=[post.author.username, post.id]),
+        {'text': f'Комментарий {rng.random()}'}
+    )
+
+
+def new_post(dataset, rng):
+    return write(
+        reverse('new_post'),
+        {
+            'text': f'Пост {rng.random()}',
+            'group': rng.choice(dataset.groups).id,
+        }
+    )
+
+
+SCENARIOS = {
+    'index': index,
+    'group_posts': group_posts,
+    'profile': profile,
+    'post_view': post_view,
+    'follow_index': follow_index,
+    'add_comment': add_comment,
+    'new_post': new_post,
+}
+
+
+def percentile(values, percent):
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method='inclusive')[
+        percent - 1
+    ]
+
+
+def run_scenario(name, dataset, requests=50, warmup=5, seed=0):
+    """ Замеры одного сценария: задержки, SQL-запросы и пик памяти.
+
+    Запросы одинаковы при одном seed; кэш сбрасывается перед прогревом,
+    прогревочные запросы в замеры не попадают.
+    """
+    rng = random.Random(f'{seed}:{name}')
+    client = Client()
+    client.force_login(rng.choice(dataset.users))
+    actions = [
+        SCENARIOS[name](dataset, rng) for _ in range(warmup + requests)
+    ]
+    cache.clear()
+    for action in actions[:warmup]:
+        action(client)
+
+    latencies = []
+    queries = []
+    for action in actions[warmup:]:
+        with CaptureQueriesContext(connection) as captured:
+            start = perf_counter()
+            response = action(client)
+            latencies.append((perf_counter() - start) * 1000)
+        if response.status_code >= 400:
+            raise RuntimeError(
+                f'{name}: ответ {response.status_code} на {response.request}'
+            )
+        queries.append(len(captured))
+
+    # память меряем отдельным проходом: tracemalloc замедляет запросы
+    gc.collect()
+    tracemalloc.start()
+    for action in actions[warmup:warmup + 10]:
+        action(client)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {
+        'requests': requests,
+        'p50_ms': round(percentile(latencies, 50), 3),
+        'p95_ms': round(percentile(latencies, 95), 3),
+        'p99_ms': round(percentile(latencies, 99), 3),
+        'queries_per_request': round(statistics.mean(queries), 2),
+        'max_queries': max(queries),
+        'peak_memory_kb': round(peak / 1024, 1),
+    }
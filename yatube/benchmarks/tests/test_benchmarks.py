@@ -0,0 +1,42 @@
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.test import TestCase, override_settings
+
+from ..dataset import seed_dataset
+from ..management.commands.benchmark import regressions
+from ..scenarios import SCENARIOS, run_scenario
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class BenchmarkTests(TestCase):
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def test_all_scenarios_measured(self):
+        """ Каждый сценарий проходит на небольшом наборе данных """
+        dataset = seed_dataset(users=4, posts=12, groups=2, seed=1)
+        self.assertEqual(len(dataset.posts), 12)
+        for name in SCENARIOS:
+            with self.subTest(scenario=name):
+                result = run_scenario(name, dataset, requests=3, warmup=1)
+                self.assertLessEqual(result['p50_ms'], result['p99_ms'])
+                self.assertGreater(result['queries_per_request'], 0)
+
+    def test_regressions_against_baseline(self):
+        """ Рост p95 сверх допуска и лишние запросы считаются регрессией """
+        baseline = {'scenarios': {
+            'index': {'p95_ms': 10, 'queries_per_request': 3},
+        }}
+        report = {'scenarios': {
+            'index': {'p95_ms': 11, 'queries_per_request': 4},
+        }}
+        self.assertEqual(len(regressions(report, baseline, 0.2)), 1)
+        report['scenarios']['index']['p95_ms'] = 13
+        self.assertEqual(len(regressions(report, baseline, 0.2)), 2)
@@ -1,5 +1,8 @@
-from django.apps import AppConfig
-
-
-class PostsConfig(AppConfig):
-    name = 'posts'
+from django.apps import AppConfig
+
+
+class PostsConfig(AppConfig):
+    name = 'posts'
+
+    def ready(self):
+        from . import signals  # noqa: F401
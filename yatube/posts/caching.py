@@ -0,0 +1,112 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import EmptyPage, PageNotAnInteger
+from django.shortcuts import get_object_or_404
+
+from .models import Group, Post
+from .paginators import ElidedPaginator
+
+INDEX_VERSION_KEY = 'index_page:version'
+
+
+def modified_key(key):
+    """ Время последней смены версии, для заголовка Last-Modified """
+    return f'{key}:modified'
+
+
+def get_version(key):
+    """ Текущее значение счетчика версии кэша """
+    version = cache.get(key)
+    if version is None:
+        # версия потеряна вместе с кэшем: считаем, что данные менялись сейчас
+        if cache.add(key, 1, timeout=None):
+            cache.set(modified_key(key), time.time(), timeout=None)
+        version = cache.get(key, 1)
+    return version
+
+
+def bump_version(key):
+    """ Сбрасывает все записи, зависящие от версии, ее увеличением """
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 2, timeout=None)
+    cache.set(modified_key(key), time.time(), timeout=None)
+
+
+def get_index_version():
+    """ Текущая версия кэша главной страницы """
+    return get_version(INDEX_VERSION_KEY)
+
+
+def bump_index_version():
+    """ Сбрасывает все закэшированные страницы главной сменой версии """
+    bump_version(INDEX_VERSION_KEY)
+
+
+def follow_version_key(user_id):
+    """ Версия кэша ленты подписок: меняется при подписке и отписке """
+    return f'follow_feed:{user_id}:version'
+
+
+def author_version_key(username):
+    """ Версия страниц автора: меняется вместе с его счетчиками подписок """
+    return f'author:{username}:version'
+
+
+def group_key(slug):
+    return f'group:{slug}'
+
+
+def get_group(slug):
+    """ Группа по slug из кэша; название и описание меняются редко """
+    key = group_key(slug)
+    group = cache.get(key)
+    if group is None:
+        group = get_object_or_404(Group, slug=slug)
+        cache.set(key, group, timeout=settings.GROUP_CACHE_TIMEOUT)
+    return group
+
+
+def forget_group(slug):
+    cache.delete(group_key(slug))
+
+
+def index_page_key(version, suffix):
+    return f'index_page:{version}:{settings.POSTS_FOR_PAGE}:{suffix}'
+
+
+def get_index_page(page_number):
+    """ Страница главной, собранная из кэша.
+
+    Храним отдельно общее число постов и строки каждой страницы,
+    поэтому в кэш никогда не попадает вся лента целиком.
+    """
+    version = get_index_version()
+    timeout = settings.INDEX_PAGE_CACHE_TIMEOUT
+    paginator = ElidedPaginator(
+        Post.objects.for_feed(), settings.POSTS_FOR_PAGE
+    )
+
+    count_key = index_page_key(version, 'count')
+    count = cache.get(count_key)
+    if count is None:
+        count = paginator.count
+        cache.set(count_key, count, timeout=timeout)
+    paginator.count = count
+
+    try:
+        number = paginator.validate_number(page_number)
+    except PageNotAnInteger:
+        number = 1
+    except EmptyPage:
+        number = paginator.num_pages
+
+    page_key = index_page_key(version, number)
+    object_list = cache.get(page_key)
+    if object_list is None:
+        object_list = list(paginator.page(number).object_list)
+        cache.set(page_key, object_list, timeout=timeout)
+    return paginator._get_page(object_list, number, paginator)
@@ -0,0 +1,49 @@
+import hashlib
+from datetime import datetime
+
+from django.contrib.auth import SESSION_KEY
+from django.core.cache import cache
+from django.utils.timezone import utc
+from django.views.decorators.http import condition
+
+from .caching import (INDEX_VERSION_KEY, author_version_key,
+                      follow_version_key, get_version, modified_key)
+
+
+def page_version_keys(request, username=None, **kwargs):
+    """ Версии, от которых зависит страница.
+
+    Посты, комментарии и группы меняют версию главной, подписки - версии
+    автора и ленты читателя. Читателя берем из сессии, не загружая его.
+    """
+    keys = [INDEX_VERSION_KEY]
+    if username is not None:
+        keys.append(author_version_key(username))
+    viewer = request.session.get(SESSION_KEY)
+    if viewer is not None:
+        keys.append(follow_version_key(viewer))
+    return keys, viewer
+
+
+def page_etag(request, *args, **kwargs):
+    keys, viewer = page_version_keys(request, **kwargs)
+    parts = [request.get_full_path(), str(viewer)]
+    parts.extend(str(get_version(key)) for key in keys)
+    # после сброса кэша версии снова начинаются с 1, а время смены - нет
+    stamps = cache.get_many([modified_key(key) for key in keys])
+    parts.extend(str(stamps.get(modified_key(key))) for key in keys)
+    return hashlib.md5(':'.join(parts).encode()).hexdigest()
+
+
+def page_last_modified(request, *args, **kwargs):
+    keys, _ = page_version_keys(request, **kwargs)
+    stamps = cache.get_many([modified_key(key) for key in keys]).values()
+    if not stamps:
+        return None
+    return datetime.fromtimestamp(max(stamps), tz=utc)
+
+
+# 304 отдается до выборки постов и рендеринга шаблона
+conditional_page = condition(
+    etag_func=page_etag, last_modified_func=page_last_modified
+)
@@ -0,0 +1,119 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from .models import Comment, Follow, Group, Post, User, UserStats
+
+
+def count_subquery(queryset, field):
+    """ Число строк queryset, связанных с внешней строкой через field """
+    return Coalesce(
+        Subquery(
+            queryset.filter(**{field: OuterRef('pk')})
+            .order_by()
+            .values(field)
+            .annotate(total=Count('pk'))
+            .values('total')
+        ),
+        0
+    )
+
+
+def user_stats_values(user_id):
+    return {
+        'followers_count': Follow.objects.filter(author_id=user_id).count(),
+        'following_count': Follow.objects.filter(user_id=user_id).count(),
+        'posts_count': Post.objects.filter(author_id=user_id).count(),
+    }
+
+
+def rebuild_user_stats(user_id):
+    """ Пересчитывает счетчики одного пользователя с нуля """
+    stats, _ = UserStats.objects.update_or_create(
+        user_id=user_id, defaults=user_stats_values(user_id)
+    )
+    return stats
+
+
+def get_user_stats(user):
+    """ Счетчики пользователя; недостающие считаются на лету """
+    try:
+        return user.stats
+    except UserStats.DoesNotExist:
+        return rebuild_user_stats(user.pk)
+
+
+def change_user_stats(user_id, field, delta):
+    stats = UserStats.objects.filter(user_id=user_id)
+    if delta < 0:
+        stats = stats.filter(**{f'{field}__gte': -delta})
+    # при удалении пользователя его счетчики уже могут быть удалены,
+    # поэтому с нуля пересчитываем только при увеличении
+    if not stats.update(**{field: F(field) + delta}) and delta > 0:
+        rebuild_user_stats(user_id)
+
+
+def change_comment_count(post_id, delta):
+    posts = Post.objects.filter(pk=post_id)
+    if delta < 0:
+        posts = posts.filter(comment_count__gte=-delta)
+    posts.update(comment_count=F('comment_count') + delta)
+
+
+def group_posts_count_key(group_id):
+    return f'group:{group_id}:posts_count'
+
+
+def group_posts_count(group_id):
+    """ Число постов группы из кэша; при промахе считается один раз """
+    key = group_posts_count_key(group_id)
+    count = cache.get(key)
+    if count is None:
+        count = Post.objects.filter(group_id=group_id).count()
+        # add, чтобы не затереть значение, уже измененное другим запросом
+        cache.add(key, count, timeout=settings.GROUP_CACHE_TIMEOUT)
+    return count
+
+
+def incr_group_posts_count(group_id, delta):
+    try:
+        cache.incr(group_posts_count_key(group_id), delta)
+    except ValueError:
+        # счетчика нет в кэше: его посчитают при следующем чтении
+        pass
+
+
+def change_group_posts_count(group_id, delta):
+    """ Меняет счетчик в кэше после коммита: откат его не затронет """
+    if group_id is None:
+        return
+    transaction.on_commit(lambda: incr_group_posts_count(group_id, delta))
+
+
+def rebuild_counters(batch_size=1000):
+    """ Пересчитывает все счетчики пачкой UPDATE-запросов.
+
+    Возвращает число обновленных постов и пользователей.
+    """
+    posts = Post.objects.update(
+        comment_count=count_subquery(Comment.objects.all(), 'post')
+    )
+    missing = User.objects.filter(stats__isnull=True).values_list(
+        'pk', flat=True
+    )
+    UserStats.objects.bulk_create(
+        (UserStats(user_id=pk) for pk in missing.iterator()),
+        batch_size=batch_size
+    )
+    users = UserStats.objects.update(
+        followers_count=count_subquery(Follow.objects.all(), 'author'),
+        following_count=count_subquery(Follow.objects.all(), 'user'),
+        posts_count=count_subquery(Post.objects.all(), 'author'),
+    )
+    cache.delete_many([
+        group_posts_count_key(pk)
+        for pk in Group.objects.values_list('pk', flat=True)
+    ])
+    return posts, users
@@ -0,0 +1,198 @@
+import sqlite3
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, connection, transaction
+from django.db.models.signals import post_delete, post_save
+
+from .models import Follow, User
+
+# по два параметра на строку: укладываемся в лимит SQLite на 999
+FOLLOW_BATCH = 400
+
+UPSERT_SQL = (
+    'INSERT INTO {table} (user_id, author_id) VALUES {values} '
+    'ON CONFLICT (user_id, author_id) DO NOTHING RETURNING id, author_id'
+)
+
+DELETE_SQL = (
+    'DELETE FROM {table} WHERE user_id = %s AND author_id IN ({values}) '
+    'RETURNING id, author_id'
+)
+
+
+def followed_key(user_id):
+    return f'followed_authors:{user_id}'
+
+
+def followed_author_ids(user):
+    """ Множество id авторов, на которых подписан пользователь.
+
+    Хранится в кэше до подписки или отписки, а в пределах запроса
+    запоминается на самом объекте пользователя.
+    """
+    if not user.is_authenticated:
+        return frozenset()
+    ids = getattr(user, '_followed_author_ids', None)
+    if ids is None:
+        key = followed_key(user.pk)
+        ids = cache.get(key)
+        if ids is None:
+            ids = frozenset(
+                Follow.objects.filter(user_id=user.pk).values_list(
+                    'author_id', flat=True
+                )
+            )
+            cache.set(
+                key, ids, timeout=settings.FOLLOWED_AUTHORS_CACHE_TIMEOUT
+            )
+        user._followed_author_ids = ids
+    return ids
+
+
+def is_following(user, author_id):
+    return author_id in followed_author_ids(user)
+
+
+def following_map(user, author_ids):
+    """ Подписан ли пользователь на каждого из авторов, без запросов
+    на каждого """
+    ids = followed_author_ids(user)
+    return {author_id: author_id in ids for author_id in author_ids}
+
+
+def forget_followed(user_id):
+    cache.delete(followed_key(user_id))
+
+
+def returning_supported():
+    """ ON CONFLICT и RETURNING есть в PostgreSQL и SQLite 3.35+ """
+    if connection.vendor == 'postgresql':
+        return True
+    return (
+        connection.vendor == 'sqlite'
+        and sqlite3.sqlite_version_info >= (3, 35)
+    )
+
+
+def insert_follows(user_id, author_ids):
+    """ Вставляет подписки, которых еще нет; возвращает [(id, author_id)]
+    только вставленных этим вызовом строк.
+
+    Без RETURNING это стоит отдельного INSERT на каждого нового автора.
+    """
+    if returning_supported():
+        sql = UPSERT_SQL.format(
+            table=Follow._meta.db_table,
+            values=', '.join(['(%s, %s)'] * len(author_ids))
+        )
+        params = [value for author_id in author_ids
+                  for value in (user_id, author_id)]
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.fetchall()
+    # без RETURNING вставляем по одной строке в точке сохранения: новой
+    # считается только строка, которую вставил именно этот вызов
+    existing = set(Follow.objects.filter(
+        user_id=user_id, author_id__in=author_ids
+    ).values_list('author_id', flat=True))
+    table = connection.ops.quote_name(Follow._meta.db_table)
+    rows = []
+    with connection.cursor() as cursor:
+        for author_id in author_ids:
+            if author_id in existing:
+                continue
+            try:
+                with transaction.atomic():
+                    cursor.execute(
+                        f'INSERT INTO {table} (user_id, author_id) '
+                        f'VALUES (%s, %s)',
+                        [user_id, author_id]
+                    )
+            except IntegrityError:
+                continue
+            rows.append((
+                connection.ops.last_insert_id(
+                    cursor, Follow._meta.db_table, 'id'
+                ),
+                author_id
+            ))
+    return rows
+
+
+def delete_follows(user_id, author_ids):
+    """ Удаляет подписки; возвращает [(id, author_id)] удаленных строк """
+    table = Follow._meta.db_table
+    values = ', '.join(['%s'] * len(author_ids))
+    with connection.cursor() as cursor:
+        if returning_supported():
+            cursor.execute(
+                DELETE_SQL.format(table=table, values=values),
+                [user_id, *author_ids]
+            )
+            return cursor.fetchall()
+        # строки заблокированы до конца транзакции (в SQLite пишет только
+        # одна транзакция), поэтому удалены будут ровно прочитанные
+        rows = list(Follow.objects.select_for_update().filter(
+            user_id=user_id, author_id__in=author_ids
+        ).values_list('id', 'author_id'))
+        if rows:
+            cursor.execute(
+                'DELETE FROM {} WHERE id IN ({})'.format(
+                    table, ', '.join(['%s'] * len(rows))
+                ),
+                [pk for pk, _ in rows]
+            )
+        return rows
+
+
+def follow_authors(user, authors):
+    """ Подписывает пользователя на авторов; возвращает новых авторов.
+
+    Повторная или одновременная подписка ничего не вставляет и не падает
+    на уникальном индексе. Для вставленных строк отправляется post_save,
+    как при save(), чтобы счетчики, ленты и кэши обновили те же
+    обработчики.
+    """
+    authors = {
+        author.pk: author for author in authors if author.pk != user.pk
+    }
+    ids = list(authors)
+    followed = []
+    with transaction.atomic():
+        for start in range(0, len(ids), FOLLOW_BATCH):
+            rows = insert_follows(user.pk, ids[start:start + FOLLOW_BATCH])
+            for pk, author_id in rows:
+                follow = Follow(pk=pk, user=user, author=authors[author_id])
+                post_save.send(
+                    sender=Follow, instance=follow, created=True,
+                    update_fields=None, raw=False, using=connection.alias
+                )
+                followed.append(authors[author_id])
+    return followed
+
+
+def unfollow_authors(user, author_ids):
+    """ Отписывает пользователя от авторов; возвращает id тех, от кого
+    отписал.
+
+    post_delete отправляется только для строк, которые удалил именно
+    этот вызов: одновременная отписка не уменьшит счетчики дважды.
+    """
+    author_ids = list(author_ids)
+    unfollowed = []
+    with transaction.atomic():
+        for start in range(0, len(author_ids), FOLLOW_BATCH):
+            rows = delete_follows(
+                user.pk, author_ids[start:start + FOLLOW_BATCH]
+            )
+            authors = User.objects.in_bulk(
+                [author_id for _, author_id in rows]
+            )
+            for pk, author_id in rows:
+                follow = Follow(pk=pk, user=user, author=authors[author_id])
+                post_delete.send(
+                    sender=Follow, instance=follow, using=connection.alias
+                )
+                unfollowed.append(author_id)
+    return unfollowed
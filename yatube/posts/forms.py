@@ -1,15 +1,25 @@
-from django import forms
-
-from .models import Comment, Post
-
-
-class PostForm(forms.ModelForm):
-    class Meta:
-        model = Post
-        fields = ('text', 'group', 'image')
-
-
-class CommentForm(forms.ModelForm):
-    class Meta:
-        model = Comment
-        fields = ('text',)
+from django import forms
+from django.core.files.uploadedfile import UploadedFile
+
+from .models import Comment, Post
+from .uploads import check_image, strip_metadata
+
+
+class PostForm(forms.ModelForm):
+    class Meta:
+        model = Post
+        fields = ('text', 'group', 'image')
+
+    def clean_image(self):
+        image = self.cleaned_data['image']
+        # уже сохраненную картинку поста проверять не нужно
+        if isinstance(image, UploadedFile):
+            check_image(image)
+            image = strip_metadata(image)
+        return image
+
+
+class CommentForm(forms.ModelForm):
+    class Meta:
+        model = Comment
+        fields = ('text',)
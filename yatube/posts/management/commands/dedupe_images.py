@@ -0,0 +1,79 @@
+import os
+import shutil
+
+from django.core.files import File
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from posts.models import Post
+from posts.storage import (file_digest, hashed_name, is_hashed_name,
+                           post_image_storage)
+
+
+class Command(BaseCommand):
+    help = 'Переносит картинки постов в хранилище по хэшу, удаляя копии'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path', default='posts',
+            help='Каталог внутри MEDIA_ROOT, который нужно обработать'
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Только посчитать, ничего не меняя'
+        )
+
+    def walk(self, directory):
+        """ Файлы каталога по одному, без построения полного списка """
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    yield from self.walk(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    yield entry
+
+    def place(self, path, target_path):
+        """ Кладет файл под новым именем; оригинал пока остается на месте """
+        os.makedirs(os.path.dirname(target_path), exist_ok=True)
+        temporary = f'{target_path}.tmp'
+        try:
+            os.link(path, temporary)
+        except OSError:
+            shutil.copyfile(path, temporary)
+        os.replace(temporary, target_path)
+
+    def handle(self, *args, **options):
+        storage = post_image_storage
+        root = storage.path(options['path'])
+        dry_run = options['dry_run']
+        targets = set()
+        scanned = duplicates = reclaimed = 0
+
+        for entry in self.walk(root):
+            name = os.path.relpath(entry.path, storage.location)
+            if is_hashed_name(name):
+                continue
+            scanned += 1
+            with open(entry.path, 'rb') as handle:
+                digest = file_digest(File(handle))
+            target = hashed_name(options['path'] + '/' + entry.name, digest)
+            if storage.exists(target) or target in targets:
+                duplicates += 1
+                reclaimed += entry.stat().st_size
+            elif not dry_run:
+                self.place(entry.path, storage.path(target))
+            targets.add(target)
+            if dry_run:
+                continue
+            # сначала ссылки постов, потом удаление: прерванный запуск
+            # оставит лишнюю копию, но не пост без картинки
+            with transaction.atomic():
+                Post.objects.filter(
+                    image=name.replace(os.sep, '/')
+                ).update(image=target)
+            os.remove(entry.path)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Файлов: {scanned}, копий удалено: {duplicates}, '
+            f'освобождено байт: {reclaimed}'
+        ))
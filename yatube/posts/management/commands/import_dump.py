@@ -0,0 +1,218 @@
+import json
+import re
+import time
+from collections import Counter, defaultdict
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.core.serializers import base, python
+from django.db import (DEFAULT_DB_ALIAS, IntegrityError, connections,
+                       transaction)
+
+from posts.caching import bump_index_version
+from posts.counters import rebuild_counters
+from posts.search import rebuild_search_index
+from posts.timeline import rebuild_timeline
+
+SEPARATORS = re.compile(r'[\s,]*')
+
+
+def iter_json_array(source, chunk_size=1 << 16):
+    """ Элементы JSON-массива по одному, без чтения файла целиком """
+    decoder = json.JSONDecoder()
+    buffer = source.read(chunk_size).lstrip()
+    if not buffer.startswith('['):
+        raise ValueError('Дамп должен быть JSON-массивом')
+    position = 1
+    eof = False
+    while True:
+        position = SEPARATORS.match(buffer, position).end()
+        if position < len(buffer) and buffer[position] == ']':
+            return
+        try:
+            item, end = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            # объект мог оборваться на границе куска: дочитываем
+            if eof:
+                raise
+            chunk = source.read(chunk_size)
+            eof = not chunk
+            buffer = buffer[position:] + chunk
+            position = 0
+            continue
+        yield item
+        position = end
+
+
+def dependency_order(models):
+    """ Модели так, чтобы каждая шла после тех, на которые ссылается """
+    ordered = []
+    seen = set()
+
+    def visit(model):
+        if model in seen:
+            return
+        seen.add(model)
+        for field in model._meta.concrete_fields + model._meta.many_to_many:
+            if field.remote_field is not None:
+                visit(field.remote_field.model)
+        ordered.append(model)
+
+    for model in models:
+        visit(model)
+    return ordered
+
+
+class Command(BaseCommand):
+    help = (
+        'Загружает дамп в формате dumpdata, читая его потоково и '
+        'вставляя строки пачками'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='JSON-файл, как у dumpdata')
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help='Сколько строк одной модели вставлять за раз'
+        )
+        parser.add_argument(
+            '-e', '--exclude', action='append', default=[],
+            help='Пропустить приложение или модель (app_label.ModelName)'
+        )
+        parser.add_argument(
+            '--database', default=DEFAULT_DB_ALIAS,
+            help='База, в которую загружать'
+        )
+        parser.add_argument(
+            '--skip-rebuild', action='store_true',
+            help='Не пересчитывать счетчики, ленты и поисковый индекс'
+        )
+
+    def handle(self, *args, **options):
+        self.using = options['database']
+        self.batch_size = options['batch_size']
+        excluded = {label.lower() for label in options['exclude']}
+        # модели в порядке зависимостей: contenttypes, пользователи,
+        # группы, посты, комментарии, подписки
+        self.order = dependency_order(apps.get_models())
+        self.buffers = defaultdict(list)
+        self.counts = Counter()
+        connection = connections[self.using]
+
+        start = time.monotonic()
+        with transaction.atomic(using=self.using):
+            # ссылки вперед по файлу проверяем один раз в конце
+            with connection.constraint_checks_disabled():
+                try:
+                    self.load(options['path'], excluded)
+                except IntegrityError as error:
+                    raise CommandError(
+                        f'{error}. Строки, которые создает migrate '
+                        f'(contenttypes, auth.permission), можно '
+                        f'пропустить через --exclude'
+                    )
+            models = [model for model in self.order if self.counts[model]]
+            try:
+                connection.check_constraints(
+                    table_names=[model._meta.db_table for model in models]
+                )
+            except IntegrityError as error:
+                raise CommandError(
+                    f'Дамп ссылается на несуществующие строки: {error}'
+                )
+            with connection.cursor() as cursor:
+                for sql in connection.ops.sequence_reset_sql(
+                        no_style(), models):
+                    cursor.execute(sql)
+            if not options['skip_rebuild']:
+                # bulk-вставка не шлет сигналы: производные данные
+                # пересчитываются разом
+                rebuild_counters(self.batch_size)
+                rebuild_timeline()
+                rebuild_search_index()
+        bump_index_version()
+        elapsed = max(time.monotonic() - start, 1e-9)
+
+        total = sum(self.counts.values())
+        for model in models:
+            self.stdout.write(f'{model._meta.label}: {self.counts[model]}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Загружено строк: {total} за {elapsed:.1f} с '
+            f'({total / elapsed:.0f} строк/с)'
+        ))
+
+    def load(self, path, excluded):
+        with open(path, encoding='utf-8') as source:
+            for data in iter_json_array(source):
+                label = data.get('model', '').lower()
+                if label in excluded or label.split('.')[0] in excluded:
+                    continue
+                self.add(data)
+        self.flush(len(self.order))
+
+    def add(self, data):
+        try:
+            obj = next(python.Deserializer(
+                [data], using=self.using, ignorenonexistent=True
+            ))
+        except base.DeserializationError as error:
+            raise CommandError(f'Не удалось разобрать {data}: {error}')
+        model = type(obj.object)
+        self.buffers[model].append(obj)
+        if len(self.buffers[model]) >= self.batch_size:
+            # сначала пишем накопленные строки моделей, от которых
+            # зависит эта
+            self.flush(self.order.index(model) + 1)
+
+    def flush(self, limit):
+        for model in self.order[:limit]:
+            objects = self.buffers.pop(model, None)
+            if objects:
+                self.save_batch(model, objects)
+
+    def save_batch(self, model, objects):
+        """ Новые строки вставляет, существующие с тем же pk обновляет """
+        manager = model._base_manager.using(self.using)
+        ops = connections[self.using].ops
+        instances = [obj.object for obj in objects]
+        existing = set()
+        # старый SQLite принимает не больше 999 параметров в запросе
+        step = ops.bulk_batch_size(['pk'], instances)
+        for start in range(0, len(instances), step):
+            existing.update(manager.filter(pk__in=[
+                instance.pk for instance in instances[start:start + step]
+            ]).values_list('pk', flat=True))
+        fields = [
+            field.name for field in model._meta.local_concrete_fields
+            if not field.primary_key
+        ]
+        new = [obj for obj in instances if obj.pk not in existing]
+        insert_fields = model._meta.local_concrete_fields
+        step = ops.bulk_batch_size(insert_fields, new) if new else 1
+        for start in range(0, len(new), step):
+            # bulk_create не умеет raw=True, как loaddata: без него
+            # auto_now_add перезаписал бы даты из дампа
+            manager._insert(
+                new[start:start + step], fields=insert_fields,
+                using=self.using, raw=True
+            )
+        updated = [obj for obj in instances if obj.pk in existing]
+        if updated:
+            manager.bulk_update(updated, fields)
+        self.save_m2m(model, objects, existing)
+        self.counts[model] += len(objects)
+
+    def save_m2m(self, model, objects, existing):
+        for field in model._meta.many_to_many:
+            through = field.remote_field.through
+            source = f'{field.m2m_field_name()}_id'
+            target = f'{field.m2m_reverse_field_name()}_id'
+            through.objects.using(self.using).filter(**{
+                f'{source}__in': existing
+            }).delete()
+            through.objects.using(self.using).bulk_create([
+                through(**{source: obj.object.pk, target: value})
+                for obj in objects
+                for value in obj.m2m_data.get(field.name, ())
+            ])
@@ -0,0 +1,31 @@
+import os
+
+from django.core.management.base import BaseCommand
+
+from posts.models import Post
+from posts.thumbnails import pregenerate_thumbnails
+
+
+class Command(BaseCommand):
+    help = (
+        'Создает миниатюры и адаптивные варианты всех картинок постов '
+        'в пуле процессов'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count(),
+            help='Число процессов'
+        )
+
+    def handle(self, *args, **options):
+        # картинки хранятся по хэшу, поэтому одинаковые обрабатываем раз
+        names = Post.objects.exclude(image='').exclude(
+            image__isnull=True
+        ).order_by('image').values_list('image', flat=True).distinct()
+        done, failed = pregenerate_thumbnails(
+            names.iterator(), options['workers']
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Миниатюр создано: {done}, ошибок: {failed}'
+        ))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from posts.counters import rebuild_counters
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает счетчики подписок, постов и комментариев'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Сколько недостающих строк счетчиков создавать за запрос'
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            posts, users = rebuild_counters(options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Пересчитаны счетчики: постов {posts}, пользователей {users}'
+        ))
@@ -0,0 +1,172 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from sorl.thumbnail import default
+from sorl.thumbnail.conf import settings as sorl_settings
+from sorl.thumbnail.helpers import deserialize
+from sorl.thumbnail.images import deserialize_image_file
+from sorl.thumbnail.kvstores.base import add_prefix, del_prefix
+from sorl.thumbnail.models import KVStore
+
+from posts.models import Post
+from posts.thumbnails import thumbnail_names, variants_key
+
+
+def file_size(name):
+    try:
+        return default.storage.size(name)
+    except OSError:
+        return 0
+
+
+def remove_file(name):
+    """ Удаляет файл миниатюры; возвращает освобожденные байты """
+    size = file_size(name)
+    try:
+        default.storage.delete(name)
+    except OSError:
+        return 0
+    return size
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаляет миниатюры удаленных и замененных картинок и файлы '
+        'в кэше миниатюр, о которых не знает KV-хранилище sorl'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Только посчитать, ничего не удаляя'
+        )
+        parser.add_argument(
+            '--budget', type=int,
+            help='Объем нужных миниатюр в байтах, сверх которого удаляются '
+                 'самые старые; они создадутся заново при показе'
+        )
+        parser.add_argument(
+            '--workers', type=int, default=8,
+            help='Потоков для удаления файлов'
+        )
+
+    def handle(self, *args, **options):
+        self.dry_run = options['dry_run']
+        # файлы новее начала обхода могли появиться уже после чтения KV
+        self.started = time.time()
+        self.files = self.bytes = self.keys = 0
+
+        live = set(
+            Post.objects.exclude(image='').exclude(image__isnull=True)
+            .values_list('image', flat=True).distinct().iterator()
+        )
+        kept = {}
+        dropped = set()
+        with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+            self.pool = pool
+            self.sweep_kvstore(live, kept, dropped)
+            files = self.sweep_files(kept, dropped)
+            if options['budget'] is not None:
+                self.enforce_budget(files, kept, options['budget'])
+
+        verb = 'Будет удалено' if self.dry_run else 'Удалено'
+        self.stdout.write(self.style.SUCCESS(
+            f'{verb} файлов: {self.files}, записей KV: {self.keys}, '
+            f'освобождено байт: {self.bytes}'
+        ))
+
+    def remove(self, names):
+        names = list(names)
+        self.files += len(names)
+        if self.dry_run:
+            sizes = map(file_size, names)
+        else:
+            sizes = self.pool.map(remove_file, names)
+        self.bytes += sum(sizes)
+
+    def delete_keys(self, *keys):
+        self.keys += len(keys)
+        if not self.dry_run and keys:
+            default.kvstore._delete_raw(*keys)
+
+    def sweep_kvstore(self, live, kept, dropped):
+        """ Обходит списки миниатюр в KV по одному источнику за раз """
+        lists = KVStore.objects.filter(
+            key__startswith=add_prefix('', 'thumbnails')
+        ).values_list('key', 'value')
+        for raw_key, value in lists.iterator():
+            source_key = del_prefix(raw_key)
+            thumbnail_keys = deserialize(value)
+            images = dict(KVStore.objects.filter(key__in=[
+                add_prefix(key) for key in [source_key, *thumbnail_keys]
+            ]).values_list('key', 'value'))
+            source = images.get(add_prefix(source_key))
+            source_name = source and deserialize_image_file(source).name
+            expected = (
+                thumbnail_names(source_name) if source_name in live else set()
+            )
+
+            keep, drop = [], []
+            for key in thumbnail_keys:
+                image = images.get(add_prefix(key))
+                name = image and deserialize_image_file(image).name
+                if name in expected:
+                    keep.append(key)
+                    kept[name] = (add_prefix(key), source_name)
+                elif name:
+                    drop.append(name)
+                    self.delete_keys(add_prefix(key))
+            dropped.update(drop)
+            self.remove(drop)
+
+            if not keep:
+                self.delete_keys(raw_key)
+                if source is not None and source_name not in live:
+                    self.delete_keys(add_prefix(source_key))
+            elif len(keep) != len(thumbnail_keys) and not self.dry_run:
+                default.kvstore._set(source_key, keep, identity='thumbnails')
+            if drop and source_name in live and not self.dry_run:
+                cache.delete(variants_key(source_name))
+
+    def sweep_files(self, kept, dropped):
+        """ Удаляет файлы кэша, которых нет в KV; возвращает остальные """
+        try:
+            root = default.storage.path(sorl_settings.THUMBNAIL_PREFIX)
+        except NotImplementedError:
+            return []
+        files = []
+        orphans = []
+        for directory, _, names in os.walk(root):
+            for name in names:
+                path = os.path.join(directory, name)
+                stat = os.stat(path)
+                relative = os.path.relpath(path, default.storage.location)
+                relative = relative.replace(os.sep, '/')
+                if relative in kept:
+                    files.append((stat.st_mtime, stat.st_size, relative))
+                elif (relative not in dropped
+                        and stat.st_mtime < self.started):
+                    orphans.append(relative)
+            if len(orphans) >= 1000:
+                self.remove(orphans)
+                orphans = []
+        self.remove(orphans)
+        return files
+
+    def enforce_budget(self, files, kept, budget):
+        """ Удаляет самые старые нужные миниатюры сверх бюджета """
+        total = sum(size for _, size, _ in files)
+        evicted = []
+        for _, size, name in sorted(files):
+            if total <= budget:
+                break
+            total -= size
+            evicted.append(name)
+            key, source_name = kept[name]
+            self.delete_keys(key)
+            if not self.dry_run:
+                cache.delete(variants_key(source_name))
+        self.remove(evicted)
@@ -0,0 +1,209 @@
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+from time import perf_counter
+
+from django.core.cache.backends.locmem import LocMemCache
+from django.template.backends.django import DjangoTemplates
+
+from .sqlite_cache import SQLiteCache
+
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+QUERIES_BUCKETS = (1, 2, 5, 10, 20, 50, 100)
+
+HISTOGRAMS = {
+    'yatube_view_seconds': ('Время обработки запроса', SECONDS_BUCKETS),
+    'yatube_view_db_seconds': ('Время SQL-запросов', SECONDS_BUCKETS),
+    'yatube_view_template_seconds': (
+        'Время рендеринга шаблонов', SECONDS_BUCKETS
+    ),
+    'yatube_view_queries': ('Число SQL-запросов', QUERIES_BUCKETS),
+}
+COUNTERS = {
+    'yatube_view_cache_hits_total': 'Попадания в кэш',
+    'yatube_view_cache_misses_total': 'Промахи кэша',
+}
+
+# замеры запроса, который сейчас обрабатывает поток
+_current = threading.local()
+
+
+class RequestStats:
+    """ Замеры одного запроса """
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.template_seconds = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+
+def start_request():
+    _current.stats = RequestStats()
+    return _current.stats
+
+
+def finish_request():
+    _current.stats = None
+
+
+def current_stats():
+    return getattr(_current, 'stats', None)
+
+
+def time_query(execute, sql, params, many, context):
+    """ Обертка connection.execute_wrapper: время и число запросов """
+    stats = current_stats()
+    if stats is None:
+        return execute(sql, params, many, context)
+    start = perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.queries += 1
+        stats.db_seconds += perf_counter() - start
+
+
+class Registry:
+    """ Гистограммы и счетчики по представлениям в памяти процесса """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            # имя -> представление -> [счетчики корзин, сумма, количество]
+            self.histograms = {
+                name: defaultdict(lambda b=buckets: [[0] * len(b), 0, 0])
+                for name, (_, buckets) in HISTOGRAMS.items()
+            }
+            self.counters = {name: defaultdict(int) for name in COUNTERS}
+
+    def observe(self, view, stats, seconds):
+        values = {
+            'yatube_view_seconds': seconds,
+            'yatube_view_db_seconds': stats.db_seconds,
+            'yatube_view_template_seconds': stats.template_seconds,
+            'yatube_view_queries': stats.queries,
+        }
+        with self.lock:
+            for name, value in values.items():
+                buckets = HISTOGRAMS[name][1]
+                series = self.histograms[name][view]
+                index = bisect_left(buckets, value)
+                if index < len(buckets):
+                    series[0][index] += 1
+                series[1] += value
+                series[2] += 1
+            self.counters['yatube_view_cache_hits_total'][view] += (
+                stats.cache_hits
+            )
+            self.counters['yatube_view_cache_misses_total'][view] += (
+                stats.cache_misses
+            )
+
+    def render(self):
+        """ Текстовый формат Prometheus """
+        lines = []
+        with self.lock:
+            for name, (help_text, buckets) in HISTOGRAMS.items():
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} histogram')
+                for view, (counts, total, count) in sorted(
+                        self.histograms[name].items()):
+                    cumulative = 0
+                    for bound, bucket in zip(buckets, counts):
+                        cumulative += bucket
+                        lines.append(
+                            f'{name}_bucket{{view="{view}",le="{bound}"}} '
+                            f'{cumulative}'
+                        )
+                    lines.append(
+                        f'{name}_bucket{{view="{view}",le="+Inf"}} {count}'
+                    )
+                    lines.append(f'{name}_sum{{view="{view}"}} {total}')
+                    lines.append(f'{name}_count{{view="{view}"}} {count}')
+            for name, help_text in COUNTERS.items():
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} counter')
+                for view, value in sorted(self.counters[name].items()):
+                    lines.append(f'{name}{{view="{view}"}} {value}')
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+
+class TimedTemplate:
+    """ Шаблон, который учитывает время своего рендеринга """
+
+    def __init__(self, template):
+        self.template = template
+
+    def __getattr__(self, name):
+        return getattr(self.template, name)
+
+    def render(self, context=None, request=None):
+        stats = current_stats()
+        start = perf_counter()
+        try:
+            return self.template.render(context, request)
+        finally:
+            if stats is not None:
+                stats.template_seconds += perf_counter() - start
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """ Бэкенд шаблонов Django с замером времени рендеринга.
+
+    Включенные через include шаблоны рендерятся внутри внешнего,
+    поэтому время не считается дважды.
+    """
+
+    def from_string(self, template_code):
+        return TimedTemplate(super().from_string(template_code))
+
+    def get_template(self, template_name):
+        return TimedTemplate(super().get_template(template_name))
+
+
+class CountingCacheMixin:
+    """ Считает попадания и промахи get() и get_many() текущего запроса """
+
+    missing = object()
+
+    def count(self, hits, misses):
+        stats = current_stats()
+        if stats is not None:
+            stats.cache_hits += hits
+            stats.cache_misses += misses
+
+    def get(self, key, default=None, version=None):
+        value = super().get(key, self.missing, version)
+        if value is self.missing:
+            self.count(0, 1)
+            return default
+        self.count(1, 0)
+        return value
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        stats = current_stats()
+        # базовый get_many читает через get(): не считаем ключи дважды
+        _current.stats = None
+        try:
+            values = super().get_many(keys, version)
+        finally:
+            _current.stats = stats
+        self.count(len(values), len(set(keys)) - len(values))
+        return values
+
+
+class CountingLocMemCache(CountingCacheMixin, LocMemCache):
+    pass
+
+
+class CountingSQLiteCache(CountingCacheMixin, SQLiteCache):
+    pass
@@ -0,0 +1,55 @@
+import logging
+from contextlib import ExitStack
+from time import perf_counter
+
+from django.conf import settings
+from django.db import connections
+
+from .metrics import finish_request, registry, start_request, time_query
+
+logger = logging.getLogger(__name__)
+
+
+class MetricsMiddleware:
+    """ Собирает время, SQL-запросы и обращения к кэшу по представлениям.
+
+    Замеры попадают в гистограммы процесса (страница /metrics/), а
+    превышение бюджета из settings.VIEW_BUDGETS пишется в лог.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        stats = start_request()
+        start = perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(time_query)
+                    )
+                response = self.get_response(request)
+        finally:
+            finish_request()
+        seconds = perf_counter() - start
+        match = request.resolver_match
+        view = match.url_name if match and match.url_name else 'unresolved'
+        registry.observe(view, stats, seconds)
+        self.check_budget(view, stats, seconds)
+        return response
+
+    def check_budget(self, view, stats, seconds):
+        budget = settings.VIEW_BUDGETS.get(view)
+        if budget is None:
+            return
+        if stats.queries > budget.get('queries', stats.queries):
+            logger.warning(
+                'Представление %s: %d SQL-запросов при бюджете %d',
+                view, stats.queries, budget['queries']
+            )
+        if seconds > budget.get('seconds', seconds):
+            logger.warning(
+                'Представление %s: %.3f с при бюджете %.3f с',
+                view, seconds, budget['seconds']
+            )
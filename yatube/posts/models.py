@@ -1,60 +1,118 @@
-from django.contrib.auth import get_user_model
-from django.db import models
-from django.db.models import UniqueConstraint
-
-User = get_user_model()
-
-
-class Post(models.Model):
-    text = models.TextField(verbose_name='Текст сообщения')
-    pub_date = models.DateTimeField('date published', auto_now_add=True)
-    author = models.ForeignKey(
-        User, on_delete=models.CASCADE, related_name='posts_relate'
-    )
-    group = models.ForeignKey(
-        'Group', on_delete=models.PROTECT, related_name='posts_relate',
-        blank=True, null=True, verbose_name='Группа'
-    )
-    image = models.ImageField(upload_to='posts/', blank=True, null=True)
-
-    class Meta:
-        ordering = ['-pub_date']
-
-    def __str__(self):
-        return self.text[:15]
-
-
-class Group(models.Model):
-    title = models.CharField(max_length=200)
-    slug = models.SlugField(unique=True)
-    description = models.TextField()
-
-    def __str__(self):
-        return self.title
-
-
-class Comment(models.Model):
-    post = models.ForeignKey(
-        'Post', on_delete=models.CASCADE, related_name='comments',
-        blank=True, null=True
-    )
-    author = models.ForeignKey(
-        User, on_delete=models.CASCADE, related_name='comments'
-    )
-    text = models.TextField(max_length=1000, verbose_name='Текст комментария')
-    created = models.DateTimeField(auto_now_add=True)
-
-
-class Follow(models.Model):
-    user = models.ForeignKey(
-        User, on_delete=models.CASCADE, related_name='follower'
-    )
-    author = models.ForeignKey(
-        User, on_delete=models.CASCADE, related_name='following'
-    )
-
-    class Meta:
-        constraints = UniqueConstraint(
-            fields=['user', 'author'],
-            name='follow'
-        )
+from django.contrib.auth import get_user_model
+from django.db import models
+from django.db.models import UniqueConstraint
+
+from .storage import post_image_storage
+
+User = get_user_model()
+
+
+class PostQuerySet(models.QuerySet):
+
+    def for_feed(self):
+        """ Посты вместе со всем, что выводит карточка поста """
+        return self.select_related('author', 'group')
+
+
+class Post(models.Model):
+    text = models.TextField(verbose_name='Текст сообщения')
+    pub_date = models.DateTimeField('date published', auto_now_add=True)
+    author = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name='posts_relate'
+    )
+    group = models.ForeignKey(
+        'Group', on_delete=models.PROTECT, related_name='posts_relate',
+        blank=True, null=True, verbose_name='Группа'
+    )
+    image = models.ImageField(
+        upload_to='posts/', storage=post_image_storage, blank=True, null=True
+    )
+    comment_count = models.PositiveIntegerField(default=0, editable=False)
+
+    objects = PostQuerySet.as_manager()
+
+    class Meta:
+        ordering = ['-pub_date', '-id']
+        # SQLite читает индексы в обратном порядке, а id хранится в каждом
+        # индексе, поэтому ленты сортируются без временных B-деревьев
+        indexes = [
+            models.Index(fields=['pub_date'], name='post_date'),
+            models.Index(fields=['group', 'pub_date'], name='post_group_date'),
+            models.Index(
+                fields=['author', 'pub_date'], name='post_author_date'
+            ),
+        ]
+
+    def __str__(self):
+        return self.text[:15]
+
+
+class Group(models.Model):
+    title = models.CharField(max_length=200)
+    slug = models.SlugField(unique=True)
+    description = models.TextField()
+
+    def __str__(self):
+        return self.title
+
+
+class Comment(models.Model):
+    post = models.ForeignKey(
+        'Post', on_delete=models.CASCADE, related_name='comments',
+        blank=True, null=True
+    )
+    author = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name='comments'
+    )
+    text = models.TextField(max_length=1000, verbose_name='Текст комментария')
+    created = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['post', 'created'], name='comment_post_created'
+            )
+        ]
+
+
+class Follow(models.Model):
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name='follower'
+    )
+    author = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name='following'
+    )
+
+    class Meta:
+        constraints = [
+            UniqueConstraint(fields=['user', 'author'], name='follow'),
+        ]
+
+
+class UserStats(models.Model):
+    user = models.OneToOneField(
+        User, on_delete=models.CASCADE, primary_key=True, related_name='stats'
+    )
+    followers_count = models.PositiveIntegerField(default=0)
+    following_count = models.PositiveIntegerField(default=0)
+    posts_count = models.PositiveIntegerField(default=0)
+
+
+class TimelineEntry(models.Model):
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name='timeline'
+    )
+    post = models.ForeignKey(
+        Post, on_delete=models.CASCADE, related_name='timeline'
+    )
+    pub_date = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            UniqueConstraint(fields=['user', 'post'], name='timeline_entry')
+        ]
+        indexes = [
+            models.Index(
+                fields=['user', 'pub_date', 'post'], name='timeline_user_date'
+            )
+        ]
@@ -0,0 +1,232 @@
+import base64
+import binascii
+from collections.abc import Sequence
+
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+
+class CursorPage(Sequence):
+    """ Страница ленты, найденная по курсору (pub_date, id).
+
+    Повторяет интерфейс django.core.paginator.Page в той мере,
+    в какой он нужен шаблонам.
+    """
+    cursor_based = True
+
+    def __init__(self, object_list, paginator, has_next, has_previous):
+        self.object_list = object_list
+        self.paginator = paginator
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __repr__(self):
+        return f'<CursorPage of {len(self)} items>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+    def next_cursor(self):
+        if not self.has_next():
+            return None
+        return self.paginator.encode_cursor(self.object_list[-1], 'n')
+
+    def previous_cursor(self):
+        if not self.has_previous():
+            return None
+        return self.paginator.encode_cursor(self.object_list[0], 'p')
+
+
+class CursorPaginator:
+    """ Постраничный вывод без COUNT(*) и OFFSET.
+
+    Ключ курсора - пара полей, по которым упорядочен queryset (для
+    постов это pub_date и id по убыванию, для комментариев - created и
+    id по возрастанию). Следующая страница выбирается условием по ключу
+    последней показанной строки, поэтому глубокие страницы стоят
+    столько же, сколько первая.
+    """
+
+    def __init__(self, object_list, per_page):
+        self.object_list = object_list
+        self.per_page = int(per_page)
+        ordering = (
+            object_list.query.order_by or object_list.model._meta.ordering
+        )
+        self.date_key, self.id_key = [key.lstrip('-') for key in ordering]
+        sign = '-' if ordering[0].startswith('-') else ''
+        self.order = [f'{sign}{self.date_key}', f'{sign}{self.id_key}']
+        self.reverse_order = [
+            key[1:] if key.startswith('-') else f'-{key}'
+            for key in self.order
+        ]
+        # в какую сторону от курсора лежат следующие строки
+        self.forward = 'lt' if sign else 'gt'
+        self.backward = 'gt' if sign else 'lt'
+
+    def encode_cursor(self, obj, direction):
+        date = getattr(obj, self.date_key)
+        value = f'{direction}|{date.isoformat()}|{getattr(obj, self.id_key)}'
+        return base64.urlsafe_b64encode(value.encode()).decode()
+
+    @staticmethod
+    def decode_cursor(cursor):
+        try:
+            value = base64.urlsafe_b64decode(cursor.encode()).decode()
+            direction, date, pk = value.split('|')
+            date = parse_datetime(date)
+            pk = int(pk)
+        except (binascii.Error, UnicodeError, ValueError):
+            return None
+        if direction not in ('n', 'p') or date is None:
+            return None
+        return direction, date, pk
+
+    def seek(self, date, pk, lookup):
+        """ Строки строго после (date, pk) в направлении lookup """
+        return self.object_list.filter(
+            Q(**{f'{self.date_key}__{lookup}e': date}),
+            Q(**{f'{self.date_key}__{lookup}': date})
+            | Q(**{f'{self.id_key}__{lookup}': pk})
+        )
+
+    def get_page(self, cursor):
+        """ Страница по курсору; неверный курсор ведет на первую """
+        position = self.decode_cursor(cursor) if cursor else None
+        if position is None:
+            rows = list(
+                self.object_list.order_by(*self.order)[:self.per_page + 1]
+            )
+            return CursorPage(
+                rows[:self.per_page], self, len(rows) > self.per_page, False
+            )
+
+        direction, date, pk = position
+        if direction == 'n':
+            rows = list(
+                self.seek(date, pk, self.forward)
+                .order_by(*self.order)[:self.per_page + 1]
+            )
+            return CursorPage(
+                rows[:self.per_page], self, len(rows) > self.per_page, True
+            )
+
+        rows = list(
+            self.seek(date, pk, self.backward)
+            .order_by(*self.reverse_order)[:self.per_page + 1]
+        )
+        return CursorPage(
+            rows[:self.per_page][::-1], self, True, len(rows) > self.per_page
+        )
+
+
+class ElidedPaginator(Paginator):
+    """ Постраничный вывод с укороченным списком номеров страниц.
+
+    В списке только первые и последние страницы и окно вокруг текущей,
+    поэтому его длина не зависит от длины ленты. С estimate=True строки
+    считаются лишь до конца окна: COUNT(*) по подзапросу с LIMIT стоит
+    одинаково для любой ленты, а последняя страница тогда не известна.
+    """
+
+    def __init__(self, object_list, per_page, estimate=False, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.estimate = estimate
+        self.on_each_side = settings.PAGE_LINKS_ON_EACH_SIDE
+        self.on_ends = settings.PAGE_LINKS_ON_ENDS
+        # известно ли, что страниц ровно num_pages
+        self.count_exact = True
+
+    def _get_page(self, *args, **kwargs):
+        # шаблоны и тесты ждут именно Page, поэтому номера - его атрибут
+        page = super()._get_page(*args, **kwargs)
+        page.elided_page_range = list(
+            self.get_elided_page_range(page.number)
+        )
+        return page
+
+    def estimate_count(self, number):
+        """ Считает строки не дальше окна вокруг страницы number """
+        try:
+            number = max(int(number), 1)
+        except (TypeError, ValueError):
+            number = 1
+        limit = (number + self.on_each_side) * self.per_page + 1
+        counted = self.object_list[:limit].count()
+        self.count_exact = counted < limit
+        self.count = min(counted, limit - 1)
+
+    def get_page(self, number):
+        if self.estimate and 'count' not in self.__dict__:
+            self.estimate_count(number)
+        return super().get_page(number)
+
+    def get_elided_page_range(self, number):
+        """ Номера страниц для ссылок; None на месте пропуска """
+        last = self.num_pages
+        side, ends = self.on_each_side, self.on_ends
+        # пропуск оставляем, только если он скрывает больше одной страницы
+        if number - side > ends + 2:
+            yield from range(1, ends + 1)
+            yield None
+            start = number - side
+        else:
+            start = 1
+        if not self.count_exact:
+            yield from range(start, last + 1)
+            yield None
+        elif number + side < last - ends - 1:
+            yield from range(start, number + side + 1)
+            yield None
+            yield from range(last - ends + 1, last + 1)
+        else:
+            yield from range(start, last + 1)
+
+
+def use_cursor(request):
+    return (
+        'cursor' in request.GET
+        or settings.POSTS_PAGINATION == 'cursor'
+    )
+
+
+def paginate(request, object_list, count=None):
+    """ Страница ленты: по курсору, если он запрошен, иначе по номеру.
+
+    Заранее известное число постов (count) избавляет от COUNT(*);
+    без него число постов оценивается, если включен POSTS_ESTIMATED_COUNT.
+    """
+    if use_cursor(request):
+        paginator = CursorPaginator(object_list, settings.POSTS_FOR_PAGE)
+        return paginator.get_page(request.GET.get('cursor'))
+    paginator = ElidedPaginator(
+        object_list,
+        settings.POSTS_FOR_PAGE,
+        estimate=count is None and settings.POSTS_ESTIMATED_COUNT
+    )
+    if count is not None:
+        paginator.count = count
+    return paginator.get_page(request.GET.get('page'))
+
+
+def paginate_comments(post, cursor=None):
+    """ Комментарии поста по порядку, страницами по курсору (created, id) """
+    comments = post.comments.select_related('author').order_by(
+        'created', 'id'
+    )
+    paginator = CursorPaginator(comments, settings.COMMENTS_FOR_PAGE)
+    return paginator.get_page(cursor)
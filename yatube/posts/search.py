@@ -0,0 +1,182 @@
+from django.db import connection
+from django.db.models.expressions import RawSQL
+from django.utils.html import escape
+
+from .models import Comment, Post
+
+POST_INDEX = 'posts_post_fts'
+COMMENT_INDEX = 'posts_comment_fts'
+
+# служебные символы вокруг найденных слов: в тексте постов их не бывает,
+# поэтому после экранирования HTML их можно заменить на <mark>; snippet()
+# с MIN(rank) в SQLite берется из самой релевантной строки
+MARK_START = '\x02'
+MARK_END = '\x03'
+
+SEARCH_SQL = f'''
+    SELECT post_id, MIN(rank) AS best, snippet FROM (
+        SELECT rowid AS post_id, bm25({POST_INDEX}) AS rank,
+            snippet({POST_INDEX}, 0, %s, %s, '…', 16) AS snippet
+        FROM {POST_INDEX} WHERE {POST_INDEX} MATCH %s
+        UNION ALL
+        SELECT post_id, bm25({COMMENT_INDEX}) AS rank,
+            snippet({COMMENT_INDEX}, 0, %s, %s, '…', 16) AS snippet
+        FROM {COMMENT_INDEX} WHERE {COMMENT_INDEX} MATCH %s
+    )
+    GROUP BY post_id
+    ORDER BY best, post_id DESC
+    LIMIT %s OFFSET %s
+'''
+
+COUNT_SQL = f'''
+    SELECT COUNT(*) FROM (
+        SELECT rowid AS post_id FROM {POST_INDEX}
+        WHERE {POST_INDEX} MATCH %s
+        UNION
+        SELECT post_id FROM {COMMENT_INDEX}
+        WHERE {COMMENT_INDEX} MATCH %s
+    )
+'''
+
+
+def search_enabled():
+    """ Полнотекстовый индекс есть только в SQLite (FTS5) """
+    return connection.vendor == 'sqlite'
+
+
+def fts_query(text):
+    """ Запрос FTS5 из пользовательской строки: все слова обязательны.
+
+    Каждое слово берется в кавычки, поэтому операторы FTS5 в запросе
+    не выполняются и не ломают его синтаксис.
+    """
+    words = [word.replace('"', '""') for word in text.split()]
+    return ' '.join(f'"{word}"' for word in words)
+
+
+def highlight(snippet):
+    return escape(snippet).replace(MARK_START, '<mark>').replace(
+        MARK_END, '</mark>'
+    )
+
+
+def index_post(post):
+    if not search_enabled():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {POST_INDEX} WHERE rowid = %s', [post.pk])
+        cursor.execute(
+            f'INSERT INTO {POST_INDEX} (rowid, text) VALUES (%s, %s)',
+            [post.pk, post.text]
+        )
+
+
+def unindex_post(post_id):
+    if not search_enabled():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {POST_INDEX} WHERE rowid = %s', [post_id])
+
+
+def index_comment(comment):
+    if not search_enabled():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {COMMENT_INDEX} WHERE rowid = %s', [comment.pk]
+        )
+        cursor.execute(
+            f'INSERT INTO {COMMENT_INDEX} (rowid, text, post_id) '
+            f'VALUES (%s, %s, %s)',
+            [comment.pk, comment.text, comment.post_id]
+        )
+
+
+def unindex_comment(comment_id):
+    if not search_enabled():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {COMMENT_INDEX} WHERE rowid = %s', [comment_id]
+        )
+
+
+def rebuild_search_index():
+    """ Заполняет индекс заново из таблиц постов и комментариев """
+    if not search_enabled():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {POST_INDEX}')
+        cursor.execute(
+            f'INSERT INTO {POST_INDEX} (rowid, text) '
+            f'SELECT id, text FROM {Post._meta.db_table}'
+        )
+        cursor.execute(f'DELETE FROM {COMMENT_INDEX}')
+        cursor.execute(
+            f'INSERT INTO {COMMENT_INDEX} (rowid, text, post_id) '
+            f'SELECT id, text, post_id FROM {Comment._meta.db_table} '
+            f'WHERE post_id IS NOT NULL'
+        )
+
+
+def matching(queryset, index, text):
+    """ Сужает queryset до строк, найденных в индексе """
+    if not text.split():
+        # из одних пробелов не получится запроса FTS5, как и фильтра
+        return queryset
+    if not search_enabled():
+        return queryset.filter(text__icontains=text)
+    return queryset.filter(pk__in=RawSQL(
+        f'SELECT rowid FROM {index} WHERE {index} MATCH %s',
+        [fts_query(text)]
+    ))
+
+
+class SearchResults:
+    """ Найденные посты по релевантности, с подсвеченным фрагментом.
+
+    Ведет себя как последовательность, поэтому его можно отдать
+    стандартному Paginator: число строк и каждая страница считаются
+    отдельными запросами к индексу.
+    """
+
+    def __init__(self, text):
+        self.query = fts_query(text)
+
+    def count(self):
+        if not self.query:
+            return 0
+        with connection.cursor() as cursor:
+            cursor.execute(COUNT_SQL, [self.query, self.query])
+            return cursor.fetchone()[0]
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        start, stop = index.start or 0, index.stop
+        if not self.query or stop is None or stop <= start:
+            return []
+        with connection.cursor() as cursor:
+            cursor.execute(SEARCH_SQL, [
+                MARK_START, MARK_END, self.query,
+                MARK_START, MARK_END, self.query,
+                stop - start, start,
+            ])
+            rows = cursor.fetchall()
+        posts = Post.objects.for_feed().in_bulk([row[0] for row in rows])
+        results = []
+        for pk, _, snippet in rows:
+            if pk in posts:
+                posts[pk].snippet = highlight(snippet)
+                results.append(posts[pk])
+        return results
+
+
+def search_posts(text):
+    """ Посты по запросу для постраничного вывода """
+    if not search_enabled():
+        return Post.objects.for_feed().filter(text__icontains=text)
+    return SearchResults(text)
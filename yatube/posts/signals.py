@@ -0,0 +1,184 @@
+from django.conf import settings
+from django.core.signals import request_finished, request_started
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .caching import (author_version_key, bump_index_version, bump_version,
+                      follow_version_key, forget_group)
+from .counters import (change_comment_count, change_group_posts_count,
+                       change_user_stats)
+from .follows import forget_followed
+from .models import Comment, Follow, Group, Post, User, UserStats
+from .search import index_comment, index_post, unindex_comment, unindex_post
+from .thumbnails import drain_queue, start_queue
+from .timeline import (backfill_followers, backfill_timeline, fan_out_post,
+                       prune_timeline)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def invalidate_index_page(sender, **kwargs):
+    # до коммита параллельный запрос закэшировал бы под новой версией
+    # еще старые данные
+    transaction.on_commit(bump_index_version)
+
+
+@receiver(post_save, sender=User)
+def create_user_stats(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        UserStats.objects.get_or_create(user=instance)
+
+
+@receiver(post_save, sender=User)
+def invalidate_author_pages(sender, instance, update_fields=None, **kwargs):
+    # вход обновляет только last_login, на страницах его нет
+    if update_fields is None or set(update_fields) != {'last_login'}:
+        bump_version(author_version_key(instance.username))
+
+
+@receiver(post_save, sender=Post)
+def count_new_post(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        change_user_stats(instance.author_id, 'posts_count', 1)
+        fan_out_post(instance)
+
+
+@receiver(post_delete, sender=Post)
+def count_deleted_post(sender, instance, **kwargs):
+    change_user_stats(instance.author_id, 'posts_count', -1)
+
+
+@receiver(pre_save, sender=Post)
+def remember_post_group(sender, instance, raw=False, **kwargs):
+    # группа до правки нужна, чтобы перенести пост между счетчиками
+    if not raw and not instance._state.adding:
+        instance._saved_group_id = Post.objects.filter(
+            pk=instance.pk
+        ).values_list('group_id', flat=True).first()
+
+
+@receiver(post_save, sender=Post)
+def count_group_post(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    old_group_id = None if created else instance._saved_group_id
+    if old_group_id != instance.group_id:
+        change_group_posts_count(old_group_id, -1)
+        change_group_posts_count(instance.group_id, 1)
+
+
+@receiver(post_delete, sender=Post)
+def count_deleted_group_post(sender, instance, **kwargs):
+    change_group_posts_count(instance.group_id, -1)
+
+
+@receiver(pre_save, sender=Group)
+def forget_renamed_group(sender, instance, raw=False, **kwargs):
+    if not raw and not instance._state.adding:
+        for slug in Group.objects.filter(pk=instance.pk).values_list(
+                'slug', flat=True):
+            forget_group(slug)
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def forget_saved_group(sender, instance, **kwargs):
+    forget_group(instance.slug)
+
+
+@receiver(post_save, sender=Comment)
+def count_new_comment(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        change_comment_count(instance.post_id, 1)
+
+
+@receiver(post_delete, sender=Comment)
+def count_deleted_comment(sender, instance, **kwargs):
+    change_comment_count(instance.post_id, -1)
+
+
+def bump_follow_versions(follow):
+    """ Подписка меняет ленту читателя, его множество авторов и
+    счетчики на страницах обоих; сбрасываем их после коммита """
+    user_id = follow.user_id
+    keys = [
+        follow_version_key(user_id),
+        author_version_key(follow.user.username),
+        author_version_key(follow.author.username),
+    ]
+
+    def bump():
+        forget_followed(user_id)
+        for key in keys:
+            bump_version(key)
+
+    transaction.on_commit(bump)
+
+
+@receiver(post_save, sender=Follow)
+def count_new_follow(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        change_user_stats(instance.author_id, 'followers_count', 1)
+        change_user_stats(instance.user_id, 'following_count', 1)
+        backfill_timeline(instance.user_id, instance.author_id)
+        bump_follow_versions(instance)
+
+
+@receiver(post_delete, sender=Follow)
+def count_deleted_follow(sender, instance, **kwargs):
+    change_user_stats(instance.author_id, 'followers_count', -1)
+    change_user_stats(instance.user_id, 'following_count', -1)
+    prune_timeline(instance.user_id, instance.author_id)
+    # автор только что опустился до порога: его посты теперь читаются
+    # только из лент, поэтому дописываем в них пропущенные
+    if UserStats.objects.filter(
+            user_id=instance.author_id,
+            followers_count=settings.TIMELINE_FANOUT_LIMIT).exists():
+        backfill_followers(instance.author_id)
+    bump_follow_versions(instance)
+
+
+@receiver(post_save, sender=Post)
+def index_saved_post(sender, instance, **kwargs):
+    index_post(instance)
+
+
+@receiver(post_delete, sender=Post)
+def unindex_deleted_post(sender, instance, **kwargs):
+    unindex_post(instance.pk)
+
+
+@receiver(post_save, sender=Comment)
+def index_saved_comment(sender, instance, **kwargs):
+    if instance.post_id is not None:
+        index_comment(instance)
+
+
+@receiver(post_delete, sender=Comment)
+def unindex_deleted_comment(sender, instance, **kwargs):
+    unindex_comment(instance.pk)
+
+
+@receiver(request_started)
+def start_thumbnail_queue(sender, **kwargs):
+    start_queue()
+
+
+@receiver(request_finished)
+def generate_queued_thumbnails(sender, **kwargs):
+    drain_queue()
+
+
+@receiver(connection_created)
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for name, value in settings.SQLITE_PRAGMAS.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
@@ -0,0 +1,256 @@
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.core.exceptions import ImproperlyConfigured
+
+# реже этого чтение не обновляет время доступа: порядок LRU остается
+# точным до секунды, а большинство чтений ничего не пишут в файл
+TOUCH_INTERVAL = 1
+
+# целые числа хранятся как INTEGER, чтобы incr() был одним UPDATE
+MIN_INTEGER = -2 ** 63
+MAX_INTEGER = 2 ** 63 - 1
+
+# UPSERT появился в SQLite 3.24, RETURNING - в 3.35
+MIN_SQLITE_VERSION = (3, 35, 0)
+
+# число записей и их объем ведут триггеры, без подсчета по таблице
+SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS cache (
+        key TEXT PRIMARY KEY,
+        value BLOB NOT NULL,
+        expires REAL,
+        accessed REAL NOT NULL,
+        size INTEGER NOT NULL
+    ) WITHOUT ROWID;
+    CREATE INDEX IF NOT EXISTS cache_accessed ON cache (accessed);
+    CREATE TABLE IF NOT EXISTS cache_stats (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        entries INTEGER NOT NULL,
+        bytes INTEGER NOT NULL
+    );
+    INSERT OR IGNORE INTO cache_stats VALUES (1, 0, 0);
+    CREATE TRIGGER IF NOT EXISTS cache_insert AFTER INSERT ON cache BEGIN
+        UPDATE cache_stats
+        SET entries = entries + 1, bytes = bytes + NEW.size;
+    END;
+    CREATE TRIGGER IF NOT EXISTS cache_delete AFTER DELETE ON cache BEGIN
+        UPDATE cache_stats
+        SET entries = entries - 1, bytes = bytes - OLD.size;
+    END;
+    CREATE TRIGGER IF NOT EXISTS cache_update
+    AFTER UPDATE OF size ON cache BEGIN
+        UPDATE cache_stats SET bytes = bytes - OLD.size + NEW.size;
+    END;
+'''
+
+UPSERT_SQL = '''
+    INSERT INTO cache (key, value, expires, accessed, size)
+    VALUES (:key, :value, :expires, :now, :size)
+    ON CONFLICT (key) DO UPDATE SET
+        value = excluded.value, expires = excluded.expires,
+        accessed = excluded.accessed, size = excluded.size
+'''
+
+# add() заменяет только просроченную запись
+ADD_SQL = UPSERT_SQL + '''
+    WHERE cache.expires IS NOT NULL AND cache.expires <= :now
+'''
+
+INCR_SQL = '''
+    UPDATE cache SET value = value + ?, accessed = ?
+    WHERE key = ? AND typeof(value) = 'integer'
+        AND (expires IS NULL OR expires > ?)
+    RETURNING value
+'''
+
+
+def encode(value):
+    if type(value) is int and MIN_INTEGER <= value <= MAX_INTEGER:
+        return value
+    return pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+
+
+def decode(value):
+    if isinstance(value, int):
+        return value
+    return pickle.loads(value)
+
+
+class SQLiteCache(BaseCache):
+    """ Кэш в файле SQLite (WAL), общий для всех процессов на сервере.
+
+    Записи вытесняются по давности чтения, когда их больше MAX_ENTRIES
+    или их объем больше MAX_BYTES. incr() выполняется одним UPDATE,
+    поэтому версии кэша увеличиваются атомарно во всех процессах.
+    """
+
+    def __init__(self, location, params):
+        if sqlite3.sqlite_version_info < MIN_SQLITE_VERSION:
+            raise ImproperlyConfigured(
+                'SQLiteCache требует SQLite 3.35 или новее, установлен %s'
+                % sqlite3.sqlite_version
+            )
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self.location = location
+        self._max_bytes = int(options.get('MAX_BYTES', 64 * 1024 * 1024))
+        self._busy_timeout = float(options.get('BUSY_TIMEOUT', 5))
+        self._local = threading.local()
+
+    def _connect(self):
+        directory = os.path.dirname(self.location)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        connection = sqlite3.connect(
+            self.location,
+            timeout=self._busy_timeout,
+            isolation_level=None,
+            check_same_thread=False
+        )
+        connection.execute('PRAGMA journal_mode = WAL')
+        connection.execute('PRAGMA synchronous = NORMAL')
+        connection.executescript(SCHEMA)
+        return connection
+
+    @property
+    def _connection(self):
+        local = self._local
+        if getattr(local, 'pid', None) != os.getpid():
+            # после fork соединение родителя использовать нельзя
+            local.connection = self._connect()
+            local.pid = os.getpid()
+        return local.connection
+
+    @contextmanager
+    def _write(self):
+        connection = self._connection
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            yield connection
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        connection.execute('COMMIT')
+
+    def _key(self, key, version):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        return key
+
+    def _cull(self, connection, now):
+        """ Вытесняет просроченные, затем давно не читанные записи """
+        entries, size = connection.execute(
+            'SELECT entries, bytes FROM cache_stats'
+        ).fetchone()
+        if entries <= self._max_entries and size <= self._max_bytes:
+            return
+        connection.execute('DELETE FROM cache WHERE expires <= ?', (now,))
+        if self._cull_frequency == 0:
+            connection.execute('DELETE FROM cache')
+            return
+        while True:
+            entries, size = connection.execute(
+                'SELECT entries, bytes FROM cache_stats'
+            ).fetchone()
+            if entries <= self._max_entries and size <= self._max_bytes:
+                return
+            connection.execute(
+                'DELETE FROM cache WHERE key IN ('
+                'SELECT key FROM cache ORDER BY accessed LIMIT ?)',
+                (max(1, entries // self._cull_frequency),)
+            )
+
+    def _store(self, sql, key, value, timeout, version):
+        key = self._key(key, version)
+        value = encode(value)
+        size = len(key) + (8 if isinstance(value, int) else len(value))
+        now = time.time()
+        with self._write() as connection:
+            if size > self._max_bytes:
+                # такая запись вытеснила бы весь кэш
+                connection.execute('DELETE FROM cache WHERE key = ?', (key,))
+                return False
+            stored = connection.execute(sql, {
+                'key': key,
+                'value': value,
+                'expires': self.get_backend_timeout(timeout),
+                'now': now,
+                'size': size,
+            }).rowcount
+            if stored:
+                self._cull(connection, now)
+        return bool(stored)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        return self._store(ADD_SQL, key, value, timeout, version)
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self._store(UPSERT_SQL, key, value, timeout, version)
+
+    def get(self, key, default=None, version=None):
+        key = self._key(key, version)
+        now = time.time()
+        row = self._connection.execute(
+            'SELECT value, expires, accessed FROM cache WHERE key = ?', (key,)
+        ).fetchone()
+        if row is None or (row[1] is not None and row[1] <= now):
+            return default
+        if now - row[2] > TOUCH_INTERVAL:
+            self._connection.execute(
+                'UPDATE cache SET accessed = ? WHERE key = ?', (now, key)
+            )
+        return decode(row[0])
+
+    def get_many(self, keys, version=None):
+        keys = {self._key(key, version): key for key in keys}
+        if not keys:
+            return {}
+        now = time.time()
+        rows = self._connection.execute(
+            'SELECT key, value FROM cache WHERE key IN ({}) '
+            'AND (expires IS NULL OR expires > ?)'.format(
+                ', '.join('?' * len(keys))
+            ),
+            [*keys, now]
+        ).fetchall()
+        return {keys[key]: decode(value) for key, value in rows}
+
+    def incr(self, key, delta=1, version=None):
+        key = self._key(key, version)
+        now = time.time()
+        rows = self._connection.execute(
+            INCR_SQL, (delta, now, key, now)
+        ).fetchall()
+        if not rows:
+            raise ValueError("Key '%s' not found" % key)
+        return rows[0][0]
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self._key(key, version)
+        now = time.time()
+        return bool(self._connection.execute(
+            'UPDATE cache SET expires = ?, accessed = ? WHERE key = ? '
+            'AND (expires IS NULL OR expires > ?)',
+            (self.get_backend_timeout(timeout), now, key, now)
+        ).rowcount)
+
+    def delete(self, key, version=None):
+        key = self._key(key, version)
+        self._connection.execute('DELETE FROM cache WHERE key = ?', (key,))
+
+    def has_key(self, key, version=None):
+        key = self._key(key, version)
+        return self._connection.execute(
+            'SELECT 1 FROM cache WHERE key = ? '
+            'AND (expires IS NULL OR expires > ?)',
+            (key, time.time())
+        ).fetchone() is not None
+
+    def clear(self):
+        self._connection.execute('DELETE FROM cache')
@@ -0,0 +1,56 @@
+import hashlib
+import os
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+
+def file_digest(content):
+    digest = hashlib.sha256()
+    for chunk in content.chunks():
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def hashed_name(name, digest):
+    """ Путь файла по его содержимому: posts/ab/cd/abcd...ef.gif """
+    directory = os.path.dirname(name)
+    extension = os.path.splitext(name)[1].lower()
+    return os.path.join(
+        directory, digest[:2], digest[2:4], f'{digest}{extension}'
+    )
+
+
+def is_hashed_name(name):
+    parts = name.replace(os.sep, '/').split('/')
+    if len(parts) < 3:
+        return False
+    digest = os.path.splitext(parts[-1])[0]
+    return (
+        len(digest) == 64
+        and parts[-3] == digest[:2]
+        and parts[-2] == digest[2:4]
+    )
+
+
+@deconstructible
+class HashedFileSystemStorage(FileSystemStorage):
+    """ Хранит каждый уникальный файл один раз под именем из его хэша.
+
+    Одинаковые загрузки получают одно и то же имя, поэтому повторная
+    загрузка ничего не пишет на диск.
+    """
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        name = hashed_name(name, file_digest(content))
+        if self.exists(name):
+            return name
+        return self._save(name, content)
+
+
+post_image_storage = HashedFileSystemStorage()
@@ -0,0 +1,11 @@
+from django import template
+
+from posts.follows import is_following
+
+register = template.Library()
+
+
+@register.filter
+def followed_by(author_id, user):
+    """ {% if post.author_id|followed_by:user %} без запроса к базе """
+    return is_following(user, author_id)
@@ -0,0 +1,27 @@
+from django import template
+from django.conf import settings
+
+from posts.thumbnails import image_variants
+
+register = template.Library()
+
+
+def srcset(variants):
+    return ', '.join(f'{url} {width}w' for url, width, _ in variants)
+
+
+@register.inclusion_tag('includes/post_image.html')
+def post_image(image):
+    """ Картинка поста с адаптивными вариантами WebP и запасного формата """
+    variants = image_variants(image)
+    if variants is None:
+        return {'src': image.url}
+    src, width, height = variants['fallback'][-1]
+    return {
+        'src': src,
+        'width': width,
+        'height': height,
+        'srcset': srcset(variants['fallback']),
+        'webp_srcset': srcset(variants['webp']),
+        'sizes': settings.POST_IMAGE_SIZES,
+    }
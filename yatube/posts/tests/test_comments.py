@@ -0,0 +1,61 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..models import Comment, Post, User
+
+
+@override_settings(COMMENTS_FOR_PAGE=2)
+class CommentPaginationTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Test_comments')
+        cls.post = Post.objects.create(text='Test', author=cls.author)
+        for number in range(5):
+            Comment.objects.create(
+                post=cls.post, author=cls.author, text=f'Comment {number}'
+            )
+        cls.url = reverse('post', args=[cls.author.username, cls.post.id])
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+
+    def get_texts(self, page):
+        return [comment.text for comment in page]
+
+    def test_load_more_walks_comments(self):
+        """ Комментарии выдаются порциями по порядку до последнего """
+        page = self.client.get(self.__class__.url).context['comments']
+        texts = self.get_texts(page)
+        while page.has_next():
+            response = self.client.get(
+                reverse('post_comments', args=[
+                    self.__class__.author.username, self.__class__.post.id
+                ]),
+                {'cursor': page.next_cursor()}
+            )
+            page = response.context['comments']
+            texts += self.get_texts(page)
+        self.assertEqual(texts, [f'Comment {number}' for number in range(5)])
+
+    def test_post_page_cost_independent_of_comments(self):
+        """ Число запросов страницы поста не растет с числом комментариев """
+        self.client.get(self.__class__.url)
+        with CaptureQueriesContext(connection) as before:
+            self.client.get(self.__class__.url)
+        for number in range(5):
+            Comment.objects.create(
+                post=self.__class__.post,
+                author=User.objects.create_user(username=f'Test_c{number}'),
+                text='More'
+            )
+        self.client.get(self.__class__.url)
+        with CaptureQueriesContext(connection) as after:
+            response = self.client.get(self.__class__.url)
+        self.assertEqual(len(after), len(before))
+        self.assertEqual(len(response.context['comments']), 2)
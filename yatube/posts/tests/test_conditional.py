@@ -0,0 +1,75 @@
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Comment, Follow, Post, User
+from .utils import commit_callbacks
+
+
+class ConditionalGetTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Test_conditional')
+        cls.user = User.objects.create_user(username='Test_conditional_user')
+        cls.post = Post.objects.create(text='Test', author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_user = Client()
+        self.authorized_user.force_login(self.__class__.user)
+
+    def test_unchanged_page_not_modified(self):
+        """ Повторный запрос с тем же ETag получает 304 без запросов """
+        url = reverse('index')
+        etag = self.client.get(url)['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_last_modified_checked(self):
+        """ Страница без изменений с If-Modified-Since тоже дает 304 """
+        url = reverse('profile', args=[self.__class__.author.username])
+        last_modified = self.client.get(url)['Last-Modified']
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 304)
+
+    def test_changes_reset_validators(self):
+        """ Комментарий и подписка меняют ETag страниц поста и автора """
+        post = self.__class__.post
+        urls = [
+            reverse('post', args=[self.__class__.author.username, post.id]),
+            reverse('profile', args=[self.__class__.author.username]),
+        ]
+        for change in (
+            lambda: Comment.objects.create(
+                post=post, author=self.__class__.user, text='Comment'
+            ),
+            lambda: Follow.objects.create(
+                user=self.__class__.user, author=self.__class__.author
+            ),
+        ):
+            etags = [self.authorized_user.get(url)['ETag'] for url in urls]
+            with commit_callbacks():
+                change()
+            for url, etag in zip(urls, etags):
+                response = self.authorized_user.get(
+                    url, HTTP_IF_NONE_MATCH=etag
+                )
+                self.assertEqual(response.status_code, 200)
+
+    def test_validator_depends_on_viewer(self):
+        """ Один и тот же ETag не подходит другому читателю """
+        url = reverse('index')
+        etag = self.client.get(url)['ETag']
+        response = self.authorized_user.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_validator_survives_cache_reset(self):
+        """ После сброса кэша старый ETag не подходит, хотя версия та же """
+        url = reverse('index')
+        etag = self.client.get(url)['ETag']
+        cache.clear()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
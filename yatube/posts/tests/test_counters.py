@@ -0,0 +1,144 @@
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.http import Http404
+from django.db import transaction
+from django.test import Client, TestCase, TransactionTestCase
+from django.urls import reverse
+
+from ..caching import get_group
+from ..counters import group_posts_count
+from ..models import Comment, Follow, Group, Post, User, UserStats
+
+
+class CountersTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Test_counters_author')
+        cls.user = User.objects.create_user(username='Test_counters_user')
+
+    def setUp(self):
+        self.authorized_author = Client()
+        self.authorized_author.force_login(self.__class__.author)
+        self.authorized_user = Client()
+        self.authorized_user.force_login(self.__class__.user)
+
+    def get_stats(self, user):
+        return UserStats.objects.get(user=user)
+
+    def test_counters_follow_views(self):
+        """ Подписка и отписка меняют счетчики обоих пользователей """
+        author = self.__class__.author
+        user = self.__class__.user
+        self.authorized_user.get(
+            reverse('profile_follow', args=[author.username])
+        )
+        self.assertEqual(self.get_stats(author).followers_count, 1)
+        self.assertEqual(self.get_stats(user).following_count, 1)
+        self.authorized_user.get(
+            reverse('profile_unfollow', args=[author.username])
+        )
+        self.assertEqual(self.get_stats(author).followers_count, 0)
+        self.assertEqual(self.get_stats(user).following_count, 0)
+
+    def test_counters_post_and_comment_views(self):
+        """ Новый пост и комментарий увеличивают счетчики """
+        author = self.__class__.author
+        self.authorized_author.post(reverse('new_post'), {'text': 'Test'})
+        self.assertEqual(self.get_stats(author).posts_count, 1)
+        post = Post.objects.get(author=author)
+        self.authorized_user.post(
+            reverse('add_comment', args=[author.username, post.id]),
+            {'text': 'Test comment'}
+        )
+        post.refresh_from_db()
+        self.assertEqual(post.comment_count, 1)
+        # редактирование поста не затирает счетчик комментариев
+        self.authorized_author.post(
+            reverse('post_edit', args=[author.username, post.id]),
+            {'text': 'Edited'}
+        )
+        post.refresh_from_db()
+        self.assertEqual(post.comment_count, 1)
+
+    def test_profile_shows_counters(self):
+        """ Карточка автора выводит счетчики без подсчета строк """
+        Post.objects.create(text='Test', author=self.__class__.author)
+        response = self.authorized_user.get(
+            reverse('profile', args=[self.__class__.author.username])
+        )
+        self.assertEqual(response.context['stats'].posts_count, 1)
+        self.assertContains(response, 'Записей: 1')
+
+    def test_rebuild_counters_command(self):
+        """ Команда rebuild_counters чинит разошедшиеся счетчики """
+        author = self.__class__.author
+        user = self.__class__.user
+        post = Post.objects.create(text='Test', author=author)
+        Comment.objects.create(post=post, author=user, text='Test')
+        Follow.objects.create(user=user, author=author)
+        UserStats.objects.update(
+            followers_count=7, following_count=7, posts_count=7
+        )
+        UserStats.objects.filter(user=user).delete()
+        Post.objects.update(comment_count=7)
+
+        call_command('rebuild_counters', stdout=StringIO())
+
+        post.refresh_from_db()
+        self.assertEqual(post.comment_count, 1)
+        self.assertEqual(self.get_stats(author).followers_count, 1)
+        self.assertEqual(self.get_stats(author).posts_count, 1)
+        self.assertEqual(self.get_stats(user).following_count, 1)
+        self.assertEqual(self.get_stats(user).posts_count, 0)
+
+
+class GroupCacheTests(TransactionTestCase):
+    """ Счетчик групп меняется после коммита, поэтому без TestCase """
+
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='Test_group_cache')
+        self.first = Group.objects.create(title='First', slug='first')
+        self.second = Group.objects.create(title='Second', slug='second')
+
+    def test_group_posts_count_follows_posts(self):
+        """ Счетчик постов группы меняется вместе с постами группы """
+        self.assertEqual(group_posts_count(self.first.pk), 0)
+        self.assertEqual(group_posts_count(self.second.pk), 0)
+        post = Post.objects.create(
+            text='Test', author=self.author, group=self.first
+        )
+        self.assertEqual(group_posts_count(self.first.pk), 1)
+        post.group = self.second
+        post.save()
+        self.assertEqual(group_posts_count(self.first.pk), 0)
+        self.assertEqual(group_posts_count(self.second.pk), 1)
+        post.delete()
+        self.assertEqual(group_posts_count(self.second.pk), 0)
+
+    def test_group_posts_count_ignores_rollback(self):
+        """ Откаченный пост не меняет счетчик в кэше """
+        self.assertEqual(group_posts_count(self.first.pk), 0)
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                Post.objects.create(
+                    text='Test', author=self.author, group=self.first
+                )
+                raise RuntimeError
+        self.assertEqual(group_posts_count(self.first.pk), 0)
+
+    def test_group_cache_invalidated_on_save(self):
+        """ Группа берется из кэша, пока ее не изменят """
+        self.assertEqual(get_group('first').title, 'First')
+        with self.assertNumQueries(0):
+            get_group('first')
+        self.first.title = 'Renamed'
+        self.first.slug = 'renamed'
+        self.first.save()
+        self.assertEqual(get_group('renamed').title, 'Renamed')
+        with self.assertRaises(Http404):
+            get_group('first')
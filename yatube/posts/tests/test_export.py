@@ -0,0 +1,69 @@
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.contrib.auth.models import Group as UserGroup
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from ..models import Post, User
+
+
+class ExportTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Test_export')
+        Post.objects.create(text='First', author=cls.author)
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def export(self, name, **options):
+        path = os.path.join(self.directory, name)
+        call_command('export_yatube', path, stdout=StringIO(), **options)
+        with open(os.path.join(path, 'manifest.json')) as manifest:
+            return path, json.load(manifest)
+
+    def test_export_with_manifest(self):
+        """ Строки выгружаются в NDJSON, манифест сходится с файлами """
+        path, manifest = self.export('full', compress='gzip')
+        info = manifest['files']['posts.post.ndjson.gz']
+        with gzip.open(os.path.join(path, 'posts.post.ndjson.gz')) as rows:
+            data = rows.read()
+        self.assertEqual(info['rows'], 1)
+        self.assertEqual(info['sha256'], hashlib.sha256(data).hexdigest())
+        self.assertEqual(json.loads(data)['fields']['text'], 'First')
+
+    def test_incremental_export(self):
+        """ С --since выгружаются только строки после прошлой выгрузки """
+        path, _ = self.export('full')
+        Post.objects.create(text='Second', author=self.__class__.author)
+        _, manifest = self.export(
+            'next', since=os.path.join(path, 'manifest.json')
+        )
+        self.assertEqual(manifest['files']['posts.post.ndjson']['rows'], 1)
+        self.assertEqual(manifest['files']['auth.user.ndjson']['rows'], 0)
+
+    def test_user_relations_prefetched(self):
+        """ Группы пользователей выгружаются без запроса на каждого """
+        editors = UserGroup.objects.create(name='editors')
+        self.__class__.author.groups.add(editors)
+        with CaptureQueriesContext(connection) as before:
+            self.export('before')
+        for index in range(5):
+            User.objects.create_user(username=f'Test_export_{index}')
+        with CaptureQueriesContext(connection) as after:
+            path, _ = self.export('after')
+        self.assertEqual(len(after), len(before))
+        with open(os.path.join(path, 'auth.user.ndjson')) as rows:
+            users = [json.loads(row) for row in rows]
+        self.assertEqual(users[0]['fields']['groups'], [editors.pk])
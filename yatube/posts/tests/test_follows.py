@@ -0,0 +1,140 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import IntegrityError, connection, transaction
+from django.db.models.signals import post_delete
+from django.template import Context, Template
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..follows import (follow_authors, followed_author_ids, following_map,
+                       insert_follows, is_following, unfollow_authors)
+from ..models import Follow, User
+from .utils import commit_callbacks
+
+
+class FollowCacheTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Test_follows_author')
+        cls.other = User.objects.create_user(username='Test_follows_other')
+        cls.user = User.objects.create_user(username='Test_follows_user')
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_user = Client()
+        self.authorized_user.force_login(self.__class__.user)
+
+    def fresh_user(self):
+        return User.objects.get(pk=self.__class__.user.pk)
+
+    def test_follow_and_unfollow_invalidate(self):
+        """ Подписка и отписка сбрасывают закэшированное множество,
+        но только после коммита """
+        author = self.__class__.author
+        self.assertFalse(is_following(self.fresh_user(), author.id))
+        with commit_callbacks():
+            Follow.objects.create(user=self.__class__.user, author=author)
+            self.assertFalse(is_following(self.fresh_user(), author.id))
+        self.assertTrue(is_following(self.fresh_user(), author.id))
+        with commit_callbacks():
+            Follow.objects.filter(user=self.__class__.user).delete()
+        self.assertFalse(is_following(self.fresh_user(), author.id))
+
+    def test_bulk_state_from_one_lookup(self):
+        """ Состояние подписки на многих авторов берется из кэша """
+        Follow.objects.create(
+            user=self.__class__.user, author=self.__class__.author
+        )
+        followed_author_ids(self.fresh_user())
+        user = self.fresh_user()
+        ids = [self.__class__.author.id, self.__class__.other.id]
+        with self.assertNumQueries(0):
+            state = following_map(user, ids)
+            rendered = Template(
+                '{% load follows %}{% if author_id|followed_by:user %}'
+                'yes{% endif %}'
+            ).render(Context({'author_id': ids[0], 'user': user}))
+        self.assertEqual(state, {ids[0]: True, ids[1]: False})
+        self.assertEqual(rendered, 'yes')
+
+    def test_profile_reads_cached_state(self):
+        """ Страница профиля не проверяет подписку запросом к базе """
+        url = reverse('profile', args=[self.__class__.author.username])
+        self.authorized_user.get(url)
+        with CaptureQueriesContext(connection) as captured:
+            response = self.authorized_user.get(url)
+        self.assertFalse(response.context['following'])
+        self.assertFalse(any(
+            'posts_follow' in query['sql'] for query in captured
+        ))
+
+
+class AtomicFollowTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Test_upsert_author')
+        cls.user = User.objects.create_user(username='Test_upsert_user')
+
+    def test_follow_is_idempotent(self):
+        """ Повторная подписка не создает строку и не меняет счетчики """
+        user, author = self.__class__.user, self.__class__.author
+        self.assertEqual(follow_authors(user, [author, user]), [author])
+        self.assertEqual(follow_authors(user, [author]), [])
+        self.assertEqual(Follow.objects.filter(user=user).count(), 1)
+        self.assertEqual(
+            User.objects.get(pk=author.pk).stats.followers_count, 1
+        )
+        self.assertEqual(unfollow_authors(user, [author.pk]), [author.pk])
+        self.assertEqual(unfollow_authors(user, [author.pk]), [])
+        self.assertEqual(
+            User.objects.get(pk=author.pk).stats.followers_count, 0
+        )
+
+    def test_unfollow_signals_only_deleted_rows(self):
+        """ post_delete уходит только для строк, удаленных этим вызовом """
+        user, author = self.__class__.user, self.__class__.author
+        deleted = []
+
+        def receiver(sender, instance, **kwargs):
+            deleted.append(instance.author_id)
+
+        post_delete.connect(receiver, sender=Follow)
+        self.addCleanup(post_delete.disconnect, receiver, sender=Follow)
+        for returning in (True, False):
+            with self.subTest(returning=returning), mock.patch(
+                    'posts.follows.returning_supported',
+                    return_value=returning):
+                follow_authors(user, [author])
+                deleted.clear()
+                self.assertEqual(
+                    unfollow_authors(user, [author.pk]), [author.pk]
+                )
+                self.assertEqual(deleted, [author.pk])
+                # строки уже нет: как если бы ее удалил другой запрос
+                self.assertEqual(unfollow_authors(user, [author.pk]), [])
+                self.assertEqual(deleted, [author.pk])
+
+    @mock.patch('posts.follows.returning_supported', return_value=False)
+    def test_insert_fallback_returns_inserted_rows(self, returning):
+        """ Без RETURNING новыми считаются только вставленные строки """
+        user, author = self.__class__.user, self.__class__.author
+        rows = insert_follows(user.pk, [author.pk])
+        follow = Follow.objects.get(user=user, author=author)
+        self.assertEqual(rows, [(follow.pk, author.pk)])
+        self.assertEqual(insert_follows(user.pk, [author.pk]), [])
+
+    def test_unique_index_applied(self):
+        """ База сама не дает создать две одинаковые подписки """
+        Follow.objects.create(
+            user=self.__class__.user, author=self.__class__.author
+        )
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Follow.objects.create(
+                user=self.__class__.user, author=self.__class__.author
+            )
@@ -1,77 +1,158 @@
-from django.core.files.uploadedfile import SimpleUploadedFile
-from django.test import Client, TestCase
-from django.urls import reverse
-
-from ..models import Group, Post, User
-
-
-class PostCreateFormTests(TestCase):
-
-    @classmethod
-    def setUpClass(cls):
-        super().setUpClass()
-        cls.user = User.objects.create_user(username='Test_views_author')
-        cls.new_group = Group.objects.create(title='Test', slug='test_slug')
-        cls.post = Post.objects.create(
-            text='Test_forms', author=__class__.user, group=__class__.new_group
-        )
-
-    def setUp(self):
-        self.guest_client = Client()
-        self.authorized_user = Client()
-        self.authorized_user.force_login(self.__class__.user)
-
-    def test_create_post_with_image(self):
-        """ Запись нового поста с картинкой в БД,
-        если форма PostForm валидна
-        """
-        # подгрузим картинку и создадим пост с ней пост
-        small_gif = (
-            b'\x47\x49\x46\x38\x39\x61\x02\x00'
-            b'\x01\x00\x80\x00\x00\x00\x00\x00'
-            b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
-            b'\x00\x00\x00\x2C\x00\x00\x00\x00'
-            b'\x02\x00\x01\x00\x00\x02\x02\x0C'
-            b'\x0A\x00\x3B'
-        )
-        uploaded = SimpleUploadedFile(
-            name='small.gif',
-            content=small_gif,
-            content_type='image/gif'
-        )
-        posts_count = Post.objects.count()
-        form_data = {
-            'text': 'Test_forms_+1',
-            'group': __class__.new_group.id,
-            'image': uploaded
-        }
-        self.authorized_user.post(
-            reverse('new_post'),
-            data=form_data,
-            follow=True
-        )
-        self.assertEqual(Post.objects.count(), posts_count + 1)
-        self.assertTrue(
-            Post.objects.filter(
-                text=form_data['text'],
-                group=form_data['group']).exists()
-        )
-
-    def test_edit_post(self):
-        """ Редактирование поста в БД"""
-        posts_count = Post.objects.count()
-        form_data = {
-            'text': 'Test_forms_edited',
-        }
-        self.authorized_user.post(
-            reverse(
-                'post_edit',
-                args=[self.__class__.user.username, self.post.id]
-            ),
-            data=form_data,
-            follow=True
-        )
-        self.assertEqual(Post.objects.count(), posts_count)
-        self.assertEqual(
-            Post.objects.get(id=self.post.id).text, 'Test_forms_edited'
-        )
+from io import BytesIO
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from ..forms import PostForm
+from ..models import Group, Post, User
+
+
+def image_upload(image_format, size=(20, 20), frames=1, **options):
+    content = BytesIO()
+    images = [
+        Image.new('RGB', size, color)
+        for color in ('red', 'blue', 'green')[:frames]
+    ]
+    images[0].save(
+        content, image_format,
+        save_all=frames > 1, append_images=images[1:], **options
+    )
+    return SimpleUploadedFile(
+        f'image.{image_format.lower()}', content.getvalue()
+    )
+
+
+class PostCreateFormTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Test_views_author')
+        cls.new_group = Group.objects.create(title='Test', slug='test_slug')
+        cls.post = Post.objects.create(
+            text='Test_forms', author=__class__.user, group=__class__.new_group
+        )
+
+    def setUp(self):
+        self.guest_client = Client()
+        self.authorized_user = Client()
+        self.authorized_user.force_login(self.__class__.user)
+
+    def test_create_post_with_image(self):
+        """ Запись нового поста с картинкой в БД,
+        если форма PostForm валидна
+        """
+        # подгрузим картинку и создадим пост с ней пост
+        small_gif = (
+            b'\x47\x49\x46\x38\x39\x61\x02\x00'
+            b'\x01\x00\x80\x00\x00\x00\x00\x00'
+            b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+            b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+            b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+            b'\x0A\x00\x3B'
+        )
+        uploaded = SimpleUploadedFile(
+            name='small.gif',
+            content=small_gif,
+            content_type='image/gif'
+        )
+        posts_count = Post.objects.count()
+        form_data = {
+            'text': 'Test_forms_+1',
+            'group': __class__.new_group.id,
+            'image': uploaded
+        }
+        self.authorized_user.post(
+            reverse('new_post'),
+            data=form_data,
+            follow=True
+        )
+        self.assertEqual(Post.objects.count(), posts_count + 1)
+        self.assertTrue(
+            Post.objects.filter(
+                text=form_data['text'],
+                group=form_data['group']).exists()
+        )
+
+    def test_edit_post(self):
+        """ Редактирование поста в БД"""
+        posts_count = Post.objects.count()
+        form_data = {
+            'text': 'Test_forms_edited',
+        }
+        self.authorized_user.post(
+            reverse(
+                'post_edit',
+                args=[self.__class__.user.username, self.post.id]
+            ),
+            data=form_data,
+            follow=True
+        )
+        self.assertEqual(Post.objects.count(), posts_count)
+        self.assertEqual(
+            Post.objects.get(id=self.post.id).text, 'Test_forms_edited'
+        )
+
+
+class PostFormImageTests(TestCase):
+
+    def form(self, upload):
+        return PostForm({'text': 'Test'}, files={'image': upload})
+
+    @override_settings(POST_IMAGE_MAX_PIXELS=100)
+    def test_too_many_pixels_rejected(self):
+        """ Картинка больше лимита точек отклоняется по заголовку """
+        form = self.form(image_upload('PNG'))
+        self.assertFalse(form.is_valid())
+        self.assertEqual(
+            form.errors.as_data()['image'][0].code, 'too_many_pixels'
+        )
+
+    @override_settings(POST_IMAGE_MAX_PIXELS=1500)
+    def test_animation_pixels_counted_over_frames(self):
+        """ Кадры анимации в пределах лимита, а все вместе - нет """
+        form = self.form(image_upload('GIF', frames=3))
+        self.assertTrue(form.is_valid())
+        form = self.form(image_upload('GIF', size=(20, 30), frames=3))
+        self.assertFalse(form.is_valid())
+        self.assertEqual(
+            form.errors.as_data()['image'][0].code, 'too_many_pixels'
+        )
+
+    def test_unsupported_format_rejected(self):
+        """ Формат вне POST_IMAGE_FORMATS отклоняется """
+        form = self.form(image_upload('BMP'))
+        self.assertFalse(form.is_valid())
+        self.assertEqual(
+            form.errors.as_data()['image'][0].code, 'invalid_format'
+        )
+
+    def test_metadata_stripped(self):
+        """ Загруженная картинка перекодируется без EXIF """
+        exif = Image.Exif()
+        exif[0x010e] = 'secret'
+        form = self.form(image_upload('JPEG', exif=exif.tobytes()))
+        self.assertTrue(form.is_valid())
+        image = Image.open(form.cleaned_data['image'])
+        self.assertEqual(image.format, 'JPEG')
+        self.assertEqual(image.size, (20, 20))
+        self.assertNotIn('exif', image.info)
+
+    def test_animation_kept_without_metadata(self):
+        """ Анимация сохраняет все кадры, а GIF теряет комментарий """
+        for image_format, options in (
+            ('GIF', {'comment': b'secret'}),
+            ('WEBP', {'xmp': b'<x:xmpmeta>secret</x:xmpmeta>'}),
+        ):
+            with self.subTest(image_format=image_format):
+                form = self.form(image_upload(
+                    image_format, frames=3, duration=100, **options
+                ))
+                self.assertTrue(form.is_valid())
+                content = form.cleaned_data['image'].read()
+                self.assertNotIn(b'secret', content)
+                image = Image.open(BytesIO(content))
+                self.assertEqual(image.format, image_format)
+                self.assertEqual(image.n_frames, 3)
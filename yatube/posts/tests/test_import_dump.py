@@ -0,0 +1,87 @@
+import io
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from ..management.commands.import_dump import iter_json_array
+from ..models import Follow, Post, TimelineEntry, User
+
+PUB_DATE = '2019-01-02T03:04:05Z'
+DUMP = [
+    # пост в файле раньше своего автора
+    {'model': 'posts.post', 'pk': 10, 'fields': {
+        'text': 'Imported', 'pub_date': PUB_DATE, 'author': 20,
+        'group': None, 'image': '',
+    }},
+    {'model': 'auth.user', 'pk': 20, 'fields': {
+        'username': 'Test_import_author', 'password': '',
+        'date_joined': PUB_DATE, 'groups': [], 'user_permissions': [],
+    }},
+    {'model': 'auth.user', 'pk': 21, 'fields': {
+        'username': 'Test_import_user', 'password': '',
+        'date_joined': PUB_DATE, 'groups': [], 'user_permissions': [],
+    }},
+    {'model': 'posts.follow', 'pk': 30, 'fields': {
+        'user': 21, 'author': 20,
+    }},
+]
+
+
+class ImportDumpTests(TestCase):
+
+    def test_array_read_in_small_chunks(self):
+        """ Элементы массива читаются и при обрыве на границе куска """
+        source = io.StringIO(json.dumps(DUMP, indent=2))
+        self.assertEqual(list(iter_json_array(source, chunk_size=7)), DUMP)
+
+    def dump_file(self, rows):
+        with tempfile.NamedTemporaryFile('w', suffix='.json',
+                                         delete=False) as dump:
+            json.dump(rows, dump)
+        self.addCleanup(os.remove, dump.name)
+        return dump.name
+
+    def test_insert_split_by_parameter_limit(self):
+        """ Пачка вставляется несколькими INSERT в пределах лимита SQL """
+        posts = [
+            {'model': 'posts.post', 'pk': pk, 'fields': {
+                'text': 'Imported', 'pub_date': PUB_DATE, 'author': 20,
+                'group': None, 'image': '',
+            }}
+            for pk in range(100, 400)
+        ]
+        name = self.dump_file(DUMP[1:2] + posts)
+        with CaptureQueriesContext(connection) as context:
+            call_command('import_dump', name, stdout=StringIO())
+        inserts = [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith('INSERT INTO "posts_post"')
+        ]
+        self.assertGreater(len(inserts), 1)
+        self.assertEqual(Post.objects.filter(pk__gte=100).count(), 300)
+
+    def test_import_dump(self):
+        """ Дамп загружается пачками с датами и пересчетом производных """
+        out = StringIO()
+        call_command(
+            'import_dump', self.dump_file(DUMP), batch_size=1, stdout=out
+        )
+        self.assertIn('Загружено строк: 4', out.getvalue())
+
+        post = Post.objects.get(pk=10)
+        self.assertEqual(
+            post.pub_date.isoformat(), '2019-01-02T03:04:05+00:00'
+        )
+        self.assertTrue(Follow.objects.filter(pk=30).exists())
+        self.assertEqual(
+            User.objects.get(pk=20).stats.followers_count, 1
+        )
+        self.assertTrue(
+            TimelineEntry.objects.filter(user_id=21, post=post).exists()
+        )
@@ -0,0 +1,81 @@
+import os
+import shutil
+import tempfile
+
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from ..metrics import (CountingLocMemCache, CountingSQLiteCache,
+                       finish_request, registry, start_request)
+from ..models import Post, User
+
+
+class MetricsTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Test_metrics')
+        cls.staff = User.objects.create_user(
+            username='Test_metrics_staff', is_staff=True
+        )
+        Post.objects.create(text='Test', author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        registry.reset()
+        self.staff_client = Client()
+        self.staff_client.force_login(self.__class__.staff)
+
+    def test_view_timings_exported(self):
+        """ Замеры представления попадают на /metrics/ """
+        self.client.get(reverse('index'))
+        self.client.get(reverse('index'))
+        histograms = registry.histograms
+        self.assertEqual(histograms['yatube_view_seconds']['index'][2], 2)
+        self.assertGreater(
+            histograms['yatube_view_queries']['index'][1], 0
+        )
+        self.assertGreater(
+            histograms['yatube_view_template_seconds']['index'][1], 0
+        )
+        self.assertGreater(
+            registry.counters['yatube_view_cache_hits_total']['index'], 0
+        )
+        response = self.staff_client.get(reverse('metrics'))
+        self.assertContains(
+            response, 'yatube_view_seconds_count{view="index"} 2'
+        )
+        self.assertContains(
+            response, 'yatube_view_queries_bucket{view="index",le="+Inf"} 2'
+        )
+
+    def test_metrics_staff_only(self):
+        """ Страница метрик закрыта для обычных пользователей """
+        response = self.client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, 302)
+
+    @override_settings(VIEW_BUDGETS={'index': {'queries': 0}})
+    def test_budget_exceeded_logged(self):
+        """ Превышение бюджета запросов пишется в лог """
+        with self.assertLogs('posts.middleware', 'WARNING'):
+            self.client.get(reverse('index'))
+
+    def test_get_many_counted(self):
+        """ get_many() считает каждый ключ один раз у обоих бэкендов """
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        backends = [
+            CountingLocMemCache('metrics', {}),
+            CountingSQLiteCache(os.path.join(directory, 'cache.sqlite3'), {}),
+        ]
+        for backend in backends:
+            with self.subTest(backend=type(backend).__name__):
+                backend.set('hit', 1)
+                stats = start_request()
+                self.addCleanup(finish_request)
+                backend.get_many(['hit', 'miss'])
+                self.assertEqual(
+                    (stats.cache_hits, stats.cache_misses), (1, 1)
+                )
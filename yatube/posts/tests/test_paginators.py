@@ -0,0 +1,56 @@
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from ..models import Post, User
+from ..paginators import ElidedPaginator
+
+
+@override_settings(PAGE_LINKS_ON_ENDS=1, PAGE_LINKS_ON_EACH_SIDE=2)
+class ElidedPaginatorTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        author = User.objects.create_user(username='Test_paginators')
+        Post.objects.bulk_create(
+            Post(text=f'Test {number}', author=author)
+            for number in range(30)
+        )
+
+    def test_elided_page_range(self):
+        """ Номера страниц: края и окно вокруг текущей """
+        paginator = ElidedPaginator(range(100), 1)
+        cases = {
+            1: [1, 2, 3, None, 100],
+            5: [1, 2, 3, 4, 5, 6, 7, None, 100],
+            50: [1, None, 48, 49, 50, 51, 52, None, 100],
+            97: [1, None, 95, 96, 97, 98, 99, 100],
+        }
+        for number, expected in cases.items():
+            with self.subTest(number=number):
+                self.assertEqual(
+                    paginator.page(number).elided_page_range, expected
+                )
+
+    def test_estimated_count_bounded_by_window(self):
+        """ Оценка считает строки только до конца окна страниц """
+        paginator = ElidedPaginator(
+            Post.objects.order_by('-id'), 2, estimate=True
+        )
+        with CaptureQueriesContext(connection) as context:
+            page = paginator.get_page(3)
+        self.assertIn('LIMIT 11', context.captured_queries[0]['sql'])
+        self.assertEqual(paginator.count, 10)
+        self.assertFalse(paginator.count_exact)
+        self.assertEqual(page.elided_page_range, [1, 2, 3, 4, 5, None])
+
+    def test_estimated_count_exact_near_end(self):
+        """ У конца ленты оценка совпадает с точным числом """
+        paginator = ElidedPaginator(
+            Post.objects.order_by('-id'), 2, estimate=True
+        )
+        page = paginator.get_page(14)
+        self.assertTrue(paginator.count_exact)
+        self.assertEqual(paginator.count, 30)
+        self.assertEqual(page.elided_page_range, [1, None, 12, 13, 14, 15])
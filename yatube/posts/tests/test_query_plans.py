@@ -0,0 +1,83 @@
+import re
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from ..models import Comment, Group, Post, User
+from ..paginators import CursorPaginator, paginate_comments
+from ..timeline import timeline_posts
+
+# до SQLite 3.36 полный проход выводится как SCAN TABLE x
+FULL_SCAN = re.compile(r'^SCAN (TABLE )?\S+$')
+
+
+class QueryPlanTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Test_plans_author')
+        cls.group = Group.objects.create(title='Test', slug='test_plans')
+        cls.post = Post.objects.create(
+            text='Test', author=cls.author, group=cls.group
+        )
+        cls.comment = Comment.objects.create(
+            post=cls.post, author=cls.author, text='Test'
+        )
+
+    def get_plan(self, queryset):
+        if isinstance(queryset, str):
+            sql, params = queryset, ()
+        else:
+            sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            return [row[-1] for row in cursor.fetchall()]
+
+    def assertUsesIndexes(self, queryset):
+        for step in self.get_plan(queryset):
+            self.assertNotIn('TEMP B-TREE', step)
+            self.assertIsNone(FULL_SCAN.match(step), step)
+
+    def test_feed_queries_use_indexes(self):
+        """ Ленты читаются по индексам без сортировки и полного прохода """
+        feeds = {
+            'index': Post.objects.for_feed(),
+            'group': self.__class__.group.posts_relate.for_feed(),
+            'profile': self.__class__.author.posts_relate.for_feed(),
+            'follow': timeline_posts(self.__class__.author),
+        }
+        now = timezone.now()
+        for name, feed in feeds.items():
+            paginator = CursorPaginator(feed, 10)
+            queries = {
+                'page': feed[:10],
+                'next': paginator.seek(now, 1, 'lt').order_by(
+                    f'-{paginator.date_key}', f'-{paginator.id_key}'
+                )[:10],
+                'previous': paginator.seek(now, 1, 'gt').order_by(
+                    paginator.date_key, paginator.id_key
+                )[:10],
+            }
+            for kind, queryset in queries.items():
+                with self.subTest(feed=name, query=kind):
+                    self.assertUsesIndexes(queryset)
+
+    def test_comments_query_uses_index(self):
+        """ Комментарии поста читаются по индексу (post, created) """
+        post = self.__class__.post
+        paginator = CursorPaginator(post.comments.order_by('created', 'id'), 1)
+        cursors = [None] + [
+            paginator.encode_cursor(self.__class__.comment, direction)
+            for direction in ('n', 'p')
+        ]
+        # разбираем те запросы, которые выполняет сама страница поста
+        with CaptureQueriesContext(connection) as queries:
+            for cursor in cursors:
+                paginate_comments(post, cursor)
+        self.assertEqual(len(queries), len(cursors))
+        for query in queries:
+            with self.subTest(sql=query['sql']):
+                self.assertUsesIndexes(query['sql'])
@@ -0,0 +1,93 @@
+from django.contrib.admin.sites import site
+from django.test import Client, RequestFactory, TestCase
+from django.urls import reverse
+
+from ..models import Comment, Post, User
+
+
+class SearchTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Test_search_author')
+        cls.post_match = Post.objects.create(
+            text='Ранний <b>рассвет</b> над рекой', author=cls.author
+        )
+        cls.post_comment = Post.objects.create(
+            text='Просто пост', author=cls.author
+        )
+        Comment.objects.create(
+            post=cls.post_comment, author=cls.author, text='Какой рассвет!'
+        )
+        cls.post_other = Post.objects.create(
+            text='Закат над морем', author=cls.author
+        )
+
+    def setUp(self):
+        self.guest_client = Client()
+
+    def search(self, query):
+        response = self.guest_client.get(reverse('search'), {'q': query})
+        return response.context['page']
+
+    def test_search_finds_posts_and_comments(self):
+        """ Поиск находит посты по тексту и по комментариям к ним """
+        page = self.search('РАССВЕТ')
+        self.assertCountEqual(
+            [post.id for post in page],
+            [self.__class__.post_match.id, self.__class__.post_comment.id]
+        )
+        self.assertEqual(page.paginator.count, 2)
+
+    def test_search_highlights_escaped_snippet(self):
+        """ Найденное слово подсвечено, а HTML из текста экранирован """
+        page = self.search('рассвет')
+        snippets = {post.id: post.snippet for post in page}
+        self.assertEqual(
+            snippets[self.__class__.post_match.id],
+            'Ранний &lt;b&gt;<mark>рассвет</mark>&lt;/b&gt; над рекой'
+        )
+
+    def test_search_index_follows_edits(self):
+        """ Индекс обновляется при изменении и удалении поста """
+        post = self.__class__.post_other
+        post.text = 'Рассвет над морем'
+        post.save()
+        self.assertEqual(len(self.search('рассвет').object_list), 3)
+        post.delete()
+        self.assertEqual(len(self.search('рассвет').object_list), 2)
+
+    def test_search_query_syntax_is_ignored(self):
+        """ Операторы FTS5 в запросе не ломают поиск """
+        for query in ('"', 'NEAR(', 'рассвет OR', '*', ''):
+            with self.subTest(query=query):
+                response = self.guest_client.get(
+                    reverse('search'), {'q': query}
+                )
+                self.assertEqual(response.status_code, 200)
+
+    def test_admin_search_uses_index(self):
+        """ Поиск в админке идет по полнотекстовому индексу """
+        model_admin = site._registry[Post]
+        request = RequestFactory().get('/admin/posts/post/')
+        queryset, _ = model_admin.get_search_results(
+            request, Post.objects.all(), 'закат'
+        )
+        self.assertEqual(list(queryset), [self.__class__.post_other])
+
+    def test_admin_blank_search_ignored(self):
+        """ Поиск из одних пробелов в админке показывает весь список """
+        admin = User.objects.create_superuser(
+            'Test_search_admin', 'admin@example.com', 'password'
+        )
+        self.guest_client.force_login(admin)
+        for model in (Post, Comment):
+            url = reverse(f'admin:posts_{model._meta.model_name}_changelist')
+            with self.subTest(model=model.__name__):
+                response = self.guest_client.get(url, {'q': '   '})
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(
+                    response.context['cl'].result_count,
+                    model.objects.count()
+                )
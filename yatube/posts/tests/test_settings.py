@@ -0,0 +1,59 @@
+import importlib
+import os
+import sys
+from unittest import mock
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.db.backends.signals import connection_created
+from django.test import TestCase, override_settings
+
+
+def load_production(**environ):
+    """ Загружает серверный профиль заново с заданным окружением """
+    sys.modules.pop('yatube.settings_production', None)
+    environ = {'DJANGO_SECRET_KEY': '', 'SECRET_KEY': '', **environ}
+    with mock.patch.dict(os.environ, environ):
+        return importlib.import_module('yatube.settings_production')
+
+
+class ProductionSettingsTest(TestCase):
+    def test_production_profile(self):
+        """ Серверный профиль без отладки и с кэшем шаблонов """
+        production = load_production(DJANGO_SECRET_KEY='production-key')
+        self.assertEqual(production.SECRET_KEY, 'production-key')
+        self.assertFalse(production.DEBUG)
+        self.assertNotIn('debug_toolbar', production.INSTALLED_APPS)
+        self.assertFalse(any(
+            middleware.startswith('debug_toolbar.')
+            for middleware in production.MIDDLEWARE
+        ))
+        self.assertGreater(production.DATABASES['default']['CONN_MAX_AGE'], 0)
+        loader, _ = production.TEMPLATES[0]['OPTIONS']['loaders'][0]
+        self.assertEqual(loader, 'django.template.loaders.cached.Loader')
+        self.assertEqual(production.SQLITE_PRAGMAS['journal_mode'], 'WAL')
+
+    def test_production_requires_secret_key(self):
+        """ Без ключа в окружении серверный профиль не загружается """
+        with self.assertRaises(ImproperlyConfigured):
+            load_production()
+        production = load_production(SECRET_KEY='ci-key')
+        self.assertEqual(production.SECRET_KEY, 'ci-key')
+
+    @override_settings(SQLITE_PRAGMAS={'cache_size': -4321})
+    def test_pragmas_applied_on_connect(self):
+        """ PRAGMA из настроек выполняются на каждом новом соединении """
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA cache_size')
+            cache_size = cursor.fetchone()[0]
+
+        def restore():
+            # соединение общее для всех тестов: возвращаем его как было
+            with connection.cursor() as cursor:
+                cursor.execute(f'PRAGMA cache_size = {cache_size}')
+
+        self.addCleanup(restore)
+        connection_created.send(sender=type(connection), connection=connection)
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA cache_size')
+            self.assertEqual(cursor.fetchone()[0], -4321)
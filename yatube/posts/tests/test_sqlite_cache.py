@@ -0,0 +1,102 @@
+import multiprocessing
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase
+
+from ..sqlite_cache import SQLiteCache
+
+
+def bump(location, times):
+    cache = SQLiteCache(location, {})
+    for _ in range(times):
+        cache.incr('version')
+
+
+class SQLiteCacheTests(SimpleTestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.location = os.path.join(self.directory, 'cache.sqlite3')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def make_cache(self, **options):
+        return SQLiteCache(self.location, {'OPTIONS': options})
+
+    def test_old_sqlite_rejected(self):
+        """ На SQLite без UPSERT и RETURNING кэш не создается """
+        with mock.patch('sqlite3.sqlite_version_info', (3, 31, 1)):
+            with self.assertRaises(ImproperlyConfigured):
+                self.make_cache()
+
+    def test_shared_between_instances(self):
+        """ Запись одного экземпляра видна другому через файл """
+        self.make_cache().set('key', {'value': [1, 2]})
+        other = self.make_cache()
+        self.assertEqual(other.get('key'), {'value': [1, 2]})
+        self.assertFalse(other.add('key', 'other'))
+        other.delete('key')
+        self.assertIsNone(self.make_cache().get('key'))
+
+    def test_expired_entry_replaced_by_add(self):
+        """ Просроченная запись не читается и заменяется через add() """
+        cache = self.make_cache()
+        cache.set('key', 'old', timeout=-1)
+        self.assertIsNone(cache.get('key'))
+        self.assertTrue(cache.add('key', 'new'))
+        self.assertEqual(cache.get('key'), 'new')
+
+    def test_lru_eviction(self):
+        """ Сверх MAX_ENTRIES вытесняются давно не читанные записи """
+        cache = self.make_cache(MAX_ENTRIES=4, CULL_FREQUENCY=2)
+        for number in range(4):
+            cache.set(f'key{number}', number)
+        cache._connection.execute(
+            'UPDATE cache SET accessed = accessed - 10 '
+            "WHERE key != ':1:key0'"
+        )
+        cache.set('key4', 4)
+        self.assertEqual(
+            cache.get_many([f'key{number}' for number in range(5)]),
+            {'key0': 0, 'key3': 3, 'key4': 4}
+        )
+
+    def test_size_limit(self):
+        """ Объем записей не превышает MAX_BYTES """
+        cache = self.make_cache(MAX_BYTES=1000)
+        for number in range(20):
+            cache.set(f'key{number}', 'x' * 100)
+        entries, size = cache._connection.execute(
+            'SELECT entries, bytes FROM cache_stats'
+        ).fetchone()
+        self.assertLessEqual(size, 1000)
+        self.assertEqual(
+            (entries, size),
+            cache._connection.execute(
+                'SELECT COUNT(*), SUM(size) FROM cache'
+            ).fetchone()
+        )
+        cache.set('huge', 'x' * 2000)
+        self.assertIsNone(cache.get('huge'))
+
+    def test_incr_is_atomic_across_processes(self):
+        """ Версии увеличиваются без потерь из нескольких процессов """
+        cache = self.make_cache()
+        cache.set('version', 0)
+        context = multiprocessing.get_context('fork')
+        workers = [
+            context.Process(target=bump, args=(self.location, 50))
+            for _ in range(4)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        self.assertEqual(cache.get('version'), 200)
+        with self.assertRaises(ValueError):
+            cache.incr('missing')
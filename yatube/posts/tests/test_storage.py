@@ -0,0 +1,80 @@
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from ..models import Post, User
+from ..storage import post_image_storage
+
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class HashedStorageTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Test_storage')
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def test_same_upload_stored_once(self):
+        """ Одинаковые картинки хранятся одним файлом по хэшу """
+        first = Post(text='Test', author=self.__class__.author)
+        first.image.save('small.gif', ContentFile(SMALL_GIF))
+        second = Post(text='Test', author=self.__class__.author)
+        second.image.save('other.GIF', ContentFile(SMALL_GIF))
+        self.assertEqual(first.image.name, second.image.name)
+        self.assertRegex(
+            first.image.name,
+            r'^posts/[0-9a-f]{2}/[0-9a-f]{2}/[0-9a-f]{64}\.gif$'
+        )
+        self.assertTrue(post_image_storage.exists(first.image.name))
+
+    def test_dedupe_images_command(self):
+        """ Команда dedupe_images убирает копии и чинит ссылки постов """
+        directory = os.path.join(TEMP_MEDIA_ROOT, 'posts')
+        os.makedirs(directory, exist_ok=True)
+        names = ['small.gif', 'small_a1b2c3.gif', 'small_d4e5f6.gif']
+        for name in names:
+            with open(os.path.join(directory, name), 'wb') as image:
+                image.write(SMALL_GIF)
+        posts = [
+            Post.objects.create(
+                text='Test',
+                author=self.__class__.author,
+                image=f'posts/{name}'
+            )
+            for name in names
+        ]
+        out = StringIO()
+
+        call_command('dedupe_images', stdout=out)
+
+        self.assertIn(
+            f'освобождено байт: {2 * len(SMALL_GIF)}', out.getvalue()
+        )
+        image_names = {
+            Post.objects.get(pk=post.pk).image.name for post in posts
+        }
+        self.assertEqual(len(image_names), 1)
+        self.assertTrue(post_image_storage.exists(image_names.pop()))
+        for name in names:
+            self.assertFalse(os.path.exists(os.path.join(directory, name)))
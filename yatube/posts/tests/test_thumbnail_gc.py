@@ -0,0 +1,92 @@
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from sorl.thumbnail import default, get_thumbnail
+from sorl.thumbnail.images import ImageFile
+
+from ..models import Post, User
+from ..thumbnails import generate_thumbnail, thumbnail_names
+from .test_storage import SMALL_GIF
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+OTHER_GIF = SMALL_GIF.replace(b'\xFF\xFF\xFF', b'\xFE\xFF\xFF', 1)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ThumbnailGCTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Test_gc')
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+        self.post = self.create_post('live.gif', SMALL_GIF)
+        generate_thumbnail(self.post.image.name)
+        self.live = thumbnail_names(self.post.image.name)
+
+        # миниатюра старой геометрии
+        self.stale = get_thumbnail(self.post.image, '50x50').name
+        # миниатюры удаленного поста
+        removed = self.create_post('removed.gif', OTHER_GIF)
+        generate_thumbnail(removed.image.name)
+        self.removed = thumbnail_names(removed.image.name)
+        removed.delete()
+        # файл, о котором KV не знает
+        self.stray = 'cache/00/00/stray.jpg'
+        default.storage.save(self.stray, ContentFile(b'x' * 100))
+
+    def tearDown(self):
+        shutil.rmtree(
+            os.path.join(TEMP_MEDIA_ROOT, 'cache'), ignore_errors=True
+        )
+
+    def create_post(self, name, content):
+        post = Post(text='Test', author=self.__class__.author)
+        post.image.save(name, ContentFile(content))
+        return post
+
+    def gc(self, *args):
+        out = StringIO()
+        call_command('thumbnail_gc', *args, stdout=out)
+        return out.getvalue()
+
+    def test_dry_run_deletes_nothing(self):
+        """ Пробный запуск только считает, что будет удалено """
+        output = self.gc('--dry-run')
+        self.assertIn(f'файлов: {len(self.removed) + 2}', output)
+        for name in [self.stale, self.stray, *self.removed]:
+            self.assertTrue(default.storage.exists(name))
+
+    def test_orphans_removed_live_kept(self):
+        """ Удаляются только ненужные миниатюры и их записи в KV """
+        output = self.gc()
+        self.assertIn(f'файлов: {len(self.removed) + 2}', output)
+        for name in [self.stale, self.stray, *self.removed]:
+            self.assertFalse(default.storage.exists(name))
+        for name in self.live:
+            self.assertTrue(default.storage.exists(name))
+        for name in [self.stale, *self.removed]:
+            self.assertIsNone(
+                default.kvstore.get(ImageFile(name, default.storage))
+            )
+        self.assertIn('файлов: 0', self.gc())
+
+    def test_budget_evicts_live_thumbnails(self):
+        """ Сверх бюджета удаляются и нужные миниатюры """
+        self.gc('--budget', '0')
+        for name in self.live:
+            self.assertFalse(default.storage.exists(name))
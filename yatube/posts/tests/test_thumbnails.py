@@ -0,0 +1,97 @@
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.template import Context, Template
+from django.test import TestCase, override_settings
+from sorl.thumbnail import get_thumbnail
+
+from ..caching import get_index_version
+from ..models import Post, User
+from ..thumbnails import (drain_queue, enqueue, generate_thumbnail,
+                          image_variants, lookup_thumbnail, pending_key,
+                          start_queue)
+from .test_storage import SMALL_GIF
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ThumbnailTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Test_thumbnails')
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+        self.post = Post(text='Test', author=self.__class__.author)
+        self.post.image.save('thumb.gif', ContentFile(SMALL_GIF))
+
+    def test_page_shows_original_until_generated(self):
+        """ Пока миниатюры нет, выводится оригинал, а миниатюра в очереди """
+        self.assertIsNone(lookup_thumbnail(self.post.image))
+        html = Template(
+            '{% load post_images %}{% post_image image %}'
+        ).render(Context({'image': self.post.image}))
+        self.assertIn(f'src="{self.post.image.url}"', html)
+        self.assertTrue(cache.get(pending_key(self.post.image.name)))
+
+    def test_generated_thumbnail_found_without_rendering(self):
+        """ Заранее созданная миниатюра находится по тем же опциям sorl """
+        self.assertTrue(generate_thumbnail(self.post.image.name))
+        expected = get_thumbnail(
+            self.post.image,
+            settings.POST_THUMBNAIL_GEOMETRY,
+            **settings.POST_THUMBNAIL_OPTIONS
+        )
+        self.assertIsNone(cache.get(pending_key(self.post.image.name)))
+        self.assertEqual(lookup_thumbnail(self.post.image).url, expected.url)
+
+    def test_variants_rendered_as_srcset(self):
+        """ Варианты выводятся через srcset в WebP и в запасном формате """
+        self.assertIsNone(image_variants(self.post.image))
+        self.assertTrue(generate_thumbnail(self.post.image.name))
+        variants = image_variants(self.post.image)
+        self.assertEqual(
+            [width for _, width, _ in variants['webp']],
+            list(settings.POST_IMAGE_WIDTHS)
+        )
+        self.assertTrue(all(
+            url.endswith('.webp') for url, _, _ in variants['webp']
+        ))
+        html = Template(
+            '{% load post_images %}{% post_image image %}'
+        ).render(Context({'image': self.post.image}))
+        self.assertIn('<source type="image/webp"', html)
+        for url, width, _ in variants['webp'] + variants['fallback']:
+            self.assertIn(f'{url} {width}w', html)
+        self.assertIn('width="960" height="339"', html)
+
+    @override_settings(THUMBNAILS_PER_REQUEST=1)
+    def test_drain_queue_limited_per_request(self):
+        """ За один запрос создается не больше THUMBNAILS_PER_REQUEST """
+        other = Post(text='Test', author=self.__class__.author)
+        other.image.save('other.gif', ContentFile(
+            SMALL_GIF.replace(b'\xFF\xFF\xFF', b'\xFE\xFF\xFF', 1)
+        ))
+        start_queue()
+        for image in (self.post.image, other.image):
+            cache.add(pending_key(image.name), True)
+            enqueue(image.name)
+        version = get_index_version()
+        drain_queue()
+        # карточка с вариантами выглядит иначе, старый ETag не годится
+        self.assertGreater(get_index_version(), version)
+        self.assertIsNotNone(lookup_thumbnail(self.post.image))
+        self.assertIsNone(lookup_thumbnail(other.image))
+        # снятая с очереди картинка ставится заново при следующем показе
+        self.assertIsNone(cache.get(pending_key(other.image.name)))
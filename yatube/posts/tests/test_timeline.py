@@ -0,0 +1,72 @@
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from ..models import Follow, Post, TimelineEntry, User
+
+
+class TimelineTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Test_timeline_author')
+        cls.user = User.objects.create_user(username='Test_timeline_user')
+        cls.old_post = Post.objects.create(text='Old', author=cls.author)
+
+    def setUp(self):
+        self.authorized_user = Client()
+        self.authorized_user.force_login(self.__class__.user)
+
+    def get_feed_texts(self):
+        response = self.authorized_user.get(reverse('follow_index'))
+        return [post.text for post in response.context['page']]
+
+    def test_follow_backfills_and_unfollow_prunes(self):
+        """ Подписка добавляет в ленту посты автора, отписка убирает """
+        author = self.__class__.author
+        self.authorized_user.get(
+            reverse('profile_follow', args=[author.username])
+        )
+        self.assertEqual(self.get_feed_texts(), ['Old'])
+        self.authorized_user.get(
+            reverse('profile_unfollow', args=[author.username])
+        )
+        self.assertFalse(
+            TimelineEntry.objects.filter(user=self.__class__.user).exists()
+        )
+        self.assertEqual(self.get_feed_texts(), [])
+
+    def test_new_post_fanned_out_to_followers(self):
+        """ Новый пост сразу записывается в ленты подписчиков """
+        Follow.objects.create(
+            user=self.__class__.user, author=self.__class__.author
+        )
+        post = Post.objects.create(text='New', author=self.__class__.author)
+        self.assertTrue(
+            TimelineEntry.objects.filter(
+                user=self.__class__.user, post=post
+            ).exists()
+        )
+        self.assertEqual(self.get_feed_texts(), ['New', 'Old'])
+
+    @override_settings(TIMELINE_FANOUT_LIMIT=0)
+    def test_popular_author_read_on_the_fly(self):
+        """ Посты популярного автора не рассылаются, а читаются из ленты """
+        Follow.objects.create(
+            user=self.__class__.user, author=self.__class__.author
+        )
+        post = Post.objects.create(text='New', author=self.__class__.author)
+        self.assertFalse(TimelineEntry.objects.filter(post=post).exists())
+        self.assertEqual(self.get_feed_texts(), ['New', 'Old'])
+
+    @override_settings(TIMELINE_FANOUT_LIMIT=1)
+    def test_posts_kept_when_author_drops_below_limit(self):
+        """ Посты, написанные сверх порога, остаются в ленте после отписок """
+        author = self.__class__.author
+        other = User.objects.create_user(username='Test_timeline_other')
+        Follow.objects.create(user=self.__class__.user, author=author)
+        Follow.objects.create(user=other, author=author)
+        Post.objects.create(text='Popular', author=author)
+        self.assertEqual(self.get_feed_texts(), ['Popular', 'Old'])
+        Follow.objects.get(user=other, author=author).delete()
+        self.assertEqual(self.get_feed_texts(), ['Popular', 'Old'])
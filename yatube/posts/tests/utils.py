@@ -0,0 +1,20 @@
+from contextlib import contextmanager
+
+from django.db import connection
+
+
+@contextmanager
+def commit_callbacks():
+    """ Выполняет on_commit, отложенные внутри блока.
+
+    TestCase не коммитит транзакцию, а captureOnCommitCallbacks
+    появился только в Django 3.2.
+    """
+    start = len(connection.run_on_commit)
+    try:
+        yield
+    finally:
+        callbacks = connection.run_on_commit[start:]
+        del connection.run_on_commit[start:]
+        for _, callback in callbacks:
+            callback()
@@ -0,0 +1,214 @@
+import hashlib
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+import django
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from sorl.thumbnail import default, get_thumbnail
+from sorl.thumbnail.conf import defaults as sorl_defaults
+from sorl.thumbnail.conf import settings as sorl_settings
+from sorl.thumbnail.images import ImageFile
+
+from .caching import bump_index_version
+from .storage import post_image_storage
+
+logger = logging.getLogger(__name__)
+
+# картинки, ждущие миниатюр до конца текущего запроса
+_queue = threading.local()
+
+
+def pending_key(name):
+    return f'thumbnail_pending:{name}'
+
+
+def variants_key(name):
+    """ Ключ готовых вариантов; меняется вместе с их настройками """
+    specs = hashlib.md5(repr(variant_specs()).encode()).hexdigest()[:8]
+    return f'post_image_variants:{specs}:{name}'
+
+
+def variant_specs():
+    """ Варианты картинки поста: (вид, ширина, высота, опции sorl).
+
+    Каждая ширина есть в WebP и в обычном формате миниатюр для браузеров
+    без WebP; пропорции те же, что у POST_THUMBNAIL_GEOMETRY.
+    """
+    width, height = map(int, settings.POST_THUMBNAIL_GEOMETRY.split('x'))
+    kinds = (
+        ('webp', settings.POST_IMAGE_WEBP_OPTIONS),
+        ('fallback', {}),
+    )
+    return [
+        (
+            kind,
+            variant_width,
+            round(height * variant_width / width),
+            dict(settings.POST_THUMBNAIL_OPTIONS, **options),
+        )
+        for kind, options in kinds
+        for variant_width in settings.POST_IMAGE_WIDTHS
+    ]
+
+
+def thumbnail_specs():
+    """ Геометрии и опции миниатюры и всех вариантов картинки поста """
+    return [
+        (settings.POST_THUMBNAIL_GEOMETRY, settings.POST_THUMBNAIL_OPTIONS)
+    ] + [
+        (f'{width}x{height}', options)
+        for _, width, height, options in variant_specs()
+    ]
+
+
+def thumbnail_options(source, options=None):
+    """ Опции миниатюры в том виде, в каком их дополняет бэкенд sorl """
+    backend = default.backend
+    options = dict(
+        settings.POST_THUMBNAIL_OPTIONS if options is None else options
+    )
+    if sorl_settings.THUMBNAIL_PRESERVE_FORMAT:
+        options.setdefault('format', backend._get_format(source))
+    for key, value in backend.default_options.items():
+        options.setdefault(key, value)
+    for key, attr in backend.extra_options:
+        value = getattr(sorl_settings, attr)
+        if value != getattr(sorl_defaults, attr):
+            options.setdefault(key, value)
+    return options
+
+
+def lookup_thumbnail(image, geometry=None, options=None):
+    """ Готовая миниатюра из KV-хранилища sorl, без обращения к картинке """
+    source = ImageFile(image)
+    name = default.backend._get_thumbnail_filename(
+        source,
+        geometry or settings.POST_THUMBNAIL_GEOMETRY,
+        thumbnail_options(source, options)
+    )
+    return default.kvstore.get(ImageFile(name, default.storage))
+
+
+def thumbnail_names(name):
+    """ Имена файлов миниатюр картинки при текущих настройках """
+    source = ImageFile(name, post_image_storage)
+    return {
+        default.backend._get_thumbnail_filename(
+            source, geometry, thumbnail_options(source, options)
+        )
+        for geometry, options in thumbnail_specs()
+    }
+
+
+def generate_thumbnail(name):
+    """ Создает миниатюру и все варианты картинки поста; возвращает успех """
+    source = ImageFile(name, post_image_storage)
+    try:
+        for geometry, options in thumbnail_specs():
+            get_thumbnail(source, geometry, **options)
+    except Exception:
+        logger.exception('Не удалось создать миниатюру %s', name)
+        return False
+    finally:
+        cache.delete(pending_key(name))
+    return True
+
+
+def start_queue():
+    _queue.names = []
+
+
+def drain_queue():
+    """ Создает миниатюры, отложенные за время запроса.
+
+    Работа не фоновая, а отложенная: она идет в том же процессе после
+    отправки ответа, и процесс все это время занят. Поэтому за запрос
+    создается не больше THUMBNAILS_PER_REQUEST картинок, а остальные
+    снимаются с очереди: их поставит следующий показ или создаст
+    команда pregenerate_thumbnails.
+    """
+    names, _queue.names = getattr(_queue, 'names', None) or [], None
+    limit = settings.THUMBNAILS_PER_REQUEST
+    done = [generate_thumbnail(name) for name in names[:limit]]
+    if any(done):
+        # карточки с готовыми вариантами выводятся иначе: сбрасываем ETag
+        bump_index_version()
+    cache.delete_many([pending_key(name) for name in names[limit:]])
+
+
+def enqueue(name):
+    names = getattr(_queue, 'names', None)
+    if names is None:
+        # вне запроса (shell, команды) откладывать некуда
+        if generate_thumbnail(name):
+            bump_index_version()
+    else:
+        names.append(name)
+
+
+def schedule_thumbnail(image):
+    """ Ставит миниатюру в очередь после коммита.
+
+    Очередь разбирается, когда ответ уже отдан клиенту, поэтому время
+    ответа не зависит от размера картинки (чего это стоит процессу -
+    см. drain_queue). Пока миниатюра в очереди, повторно ее не ставим
+    и не ищем в KV.
+    """
+    if not image or not cache.add(pending_key(image.name), True, 60):
+        return
+    name = image.name
+    transaction.on_commit(lambda: enqueue(name))
+
+
+def image_variants(image):
+    """ Готовые варианты картинки: {вид: [(url, ширина, высота)]}.
+
+    Пока хоть одного варианта нет, возвращает None и ставит их создание
+    в очередь; найденные варианты запоминаются в кэше целиком, чтобы
+    карточка не ходила в KV за каждым из них.
+    """
+    key = variants_key(image.name)
+    variants = cache.get(key)
+    if variants is not None:
+        return variants
+    if cache.get(pending_key(image.name)) is not None:
+        return None
+    variants = {}
+    for kind, width, height, options in variant_specs():
+        thumbnail = lookup_thumbnail(image, f'{width}x{height}', options)
+        if thumbnail is None:
+            schedule_thumbnail(image)
+            return None
+        variants.setdefault(kind, []).append((thumbnail.url, width, height))
+    cache.set(key, variants, settings.POST_IMAGE_VARIANTS_CACHE_TIMEOUT)
+    return variants
+
+
+def pregenerate_thumbnails(names, workers, batch_size=1000):
+    """ Создает миниатюры и варианты в пуле процессов.
+
+    Возвращает (успешно, ошибок).
+    """
+    # процессы запускаются заново, а не через fork: иначе они унаследуют
+    # открытое соединение родителя, которым тот читает names
+    context = multiprocessing.get_context('spawn')
+    names = iter(names)
+    done = failed = 0
+    with ProcessPoolExecutor(
+            max_workers=workers, mp_context=context,
+            initializer=django.setup) as pool:
+        # пачками, чтобы не держать в памяти задания на все картинки сразу
+        batch = list(islice(names, batch_size))
+        while batch:
+            results = list(pool.map(generate_thumbnail, batch, chunksize=16))
+            done += results.count(True)
+            failed += results.count(False)
+            batch = list(islice(names, batch_size))
+    if done:
+        bump_index_version()
+    return done, failed
@@ -0,0 +1,93 @@
+from django.conf import settings
+from django.db.models import F, Q
+
+from .models import Follow, Post, TimelineEntry, UserStats
+
+
+def is_fanout_author(author_id):
+    """ Рассылать ли посты автора подписчикам при записи """
+    return not UserStats.objects.filter(
+        user_id=author_id,
+        followers_count__gt=settings.TIMELINE_FANOUT_LIMIT
+    ).exists()
+
+
+def fan_out_post(post):
+    """ Добавляет новый пост в ленты подписчиков автора """
+    if not is_fanout_author(post.author_id):
+        return
+    followers = Follow.objects.filter(
+        author_id=post.author_id
+    ).values_list('user_id', flat=True)
+    TimelineEntry.objects.bulk_create(
+        [
+            TimelineEntry(user_id=user_id, post=post, pub_date=post.pub_date)
+            for user_id in followers.iterator()
+        ],
+        batch_size=500,
+        ignore_conflicts=True
+    )
+
+
+def backfill_timeline(user_id, author_id):
+    """ Добавляет в ленту подписчика последние посты автора """
+    posts = Post.objects.filter(author_id=author_id).values_list(
+        'pk', 'pub_date'
+    )[:settings.TIMELINE_BACKFILL_POSTS]
+    TimelineEntry.objects.bulk_create(
+        [
+            TimelineEntry(user_id=user_id, post_id=pk, pub_date=pub_date)
+            for pk, pub_date in posts
+        ],
+        ignore_conflicts=True
+    )
+
+
+def backfill_followers(author_id):
+    """ Дополняет ленты подписчиков автора, вернувшегося под порог.
+
+    Пока подписчиков было больше TIMELINE_FANOUT_LIMIT, его посты
+    читались напрямую и в ленты не записывались.
+    """
+    followers = Follow.objects.filter(
+        author_id=author_id
+    ).values_list('user_id', flat=True)
+    for user_id in followers.iterator():
+        backfill_timeline(user_id, author_id)
+
+
+def prune_timeline(user_id, author_id):
+    """ Убирает из ленты посты автора, от которого отписались """
+    TimelineEntry.objects.filter(
+        user_id=user_id, post__author_id=author_id
+    ).delete()
+
+
+def rebuild_timeline():
+    """ Дополняет ленты всех подписчиков постами их авторов """
+    follows = Follow.objects.values_list('user_id', 'author_id')
+    for user_id, author_id in follows.iterator():
+        backfill_timeline(user_id, author_id)
+
+
+def timeline_posts(user):
+    """ Посты ленты подписок пользователя.
+
+    Обычно это готовые записи TimelineEntry; посты авторов, которым
+    рассылка не делается, дочитываются напрямую.
+    """
+    posts = Post.objects.for_feed()
+    pulled_authors = list(
+        Follow.objects.filter(
+            user=user,
+            author__stats__followers_count__gt=settings.TIMELINE_FANOUT_LIMIT
+        ).values_list('author_id', flat=True)
+    )
+    if not pulled_authors:
+        # сортируем по полям записи ленты, чтобы читать ее индекс по порядку
+        return posts.filter(timeline__user=user).annotate(
+            feed_date=F('timeline__pub_date'),
+            feed_post=F('timeline__post')
+        ).order_by('-feed_date', '-feed_post')
+    entries = TimelineEntry.objects.filter(user=user).values('post_id')
+    return posts.filter(Q(pk__in=entries) | Q(author_id__in=pulled_authors))
@@ -0,0 +1,94 @@
+from tempfile import SpooledTemporaryFile
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import UploadedFile
+from PIL import Image, ImageOps
+
+# форматы, которые перекодируются без метаданных; XMP Pillow в GIF
+# не пишет, а комментарий из исходного файла заменяем пустым
+SAVE_OPTIONS = {
+    'JPEG': {'quality': 90, 'optimize': True},
+    'PNG': {'optimize': True},
+    'GIF': {'comment': b''},
+    'WEBP': {'quality': 90},
+}
+
+
+def check_image(upload):
+    """ Проверяет картинку по заголовку, не декодируя пикселей.
+
+    Image.open читает только заголовок, поэтому огромная или
+    «сжатая бомба» отклоняется раньше, чем займет память.
+    """
+    if upload.size > settings.POST_IMAGE_MAX_BYTES:
+        raise ValidationError(
+            'Файл больше %(limit)s байт.',
+            code='file_too_large',
+            params={'limit': settings.POST_IMAGE_MAX_BYTES}
+        )
+    upload.seek(0)
+    try:
+        image = Image.open(upload)
+    except (OSError, Image.DecompressionBombError):
+        raise ValidationError(
+            'Загрузите правильное изображение.', code='invalid_image'
+        )
+    if image.format not in settings.POST_IMAGE_FORMATS:
+        raise ValidationError(
+            'Формат %(format)s не поддерживается.',
+            code='invalid_format',
+            params={'format': image.format}
+        )
+    width, height = image.size
+    if max(width, height) > settings.POST_IMAGE_MAX_SIDE:
+        raise ValidationError(
+            'Сторона картинки больше %(limit)s точек.',
+            code='too_large',
+            params={'limit': settings.POST_IMAGE_MAX_SIDE}
+        )
+    # при перекодировании анимации декодируется каждый кадр, поэтому
+    # лимит считается по всем кадрам; n_frames читает только заголовки
+    frames = getattr(image, 'n_frames', 1)
+    if width * height * frames > settings.POST_IMAGE_MAX_PIXELS:
+        raise ValidationError(
+            'В картинке больше %(limit)s точек.',
+            code='too_many_pixels',
+            params={'limit': settings.POST_IMAGE_MAX_PIXELS}
+        )
+
+
+def strip_metadata(upload):
+    """ Перекодирует проверенную картинку без EXIF и прочих метаданных.
+
+    Декодированная картинка не больше POST_IMAGE_MAX_PIXELS точек, а
+    результат пишется во временный файл, который уходит на диск сверх
+    FILE_UPLOAD_MAX_MEMORY_SIZE: память на загрузку ограничена сверху.
+    """
+    upload.seek(0)
+    image = Image.open(upload)
+    image_format = image.format
+    if image_format not in SAVE_OPTIONS:
+        upload.seek(0)
+        return upload
+    options = dict(SAVE_OPTIONS[image_format])
+    if getattr(image, 'n_frames', 1) > 1:
+        # анимацию сохраняем целиком; поворот Pillow применил бы
+        # только к первому кадру, а остальные потерял бы
+        options['save_all'] = True
+    else:
+        # поворот из EXIF применяем к точкам, раз сам EXIF не сохраним
+        image = ImageOps.exif_transpose(image)
+    output = SpooledTemporaryFile(
+        max_size=settings.FILE_UPLOAD_MAX_MEMORY_SIZE
+    )
+    image.save(output, image_format, **options)
+    size = output.tell()
+    output.seek(0)
+    return UploadedFile(
+        output,
+        name=upload.name,
+        content_type=upload.content_type,
+        size=size,
+        charset=upload.charset
+    )
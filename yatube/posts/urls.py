@@ -1,27 +1,33 @@
-from django.urls import path
-
-from . import views
-
-urlpatterns = [
-    path('', views.index, name='index'),
-    path('new/', views.new_post, name='new_post'),
-    path(
-        '<str:username>/<int:post_id>/edit/', views.post_edit, name='post_edit'
-    ),
-    path('group/<slug:slug>/', views.group_posts, name='group_posts'),
-    path('follow/', views.follow_index, name='follow_index'),
-    path(
-        '<str:username>/follow/', views.profile_follow, name='profile_follow'
-    ),
-    path(
-        '<str:username>/unfollow/',
-        views.profile_unfollow,
-        name='profile_unfollow'
-    ),
-    path('<str:username>/', views.profile, name='profile'),
-    path('<str:username>/<int:post_id>/', views.post_view, name='post'),
-    path(
-        '<str:username>/<int:post_id>/comment/',
-        views.add_comment, name='add_comment'
-    ),
-]
+from django.urls import path
+
+from . import views
+
+urlpatterns = [
+    path('', views.index, name='index'),
+    path('new/', views.new_post, name='new_post'),
+    path('search/', views.search, name='search'),
+    path('metrics/', views.metrics, name='metrics'),
+    path(
+        '<str:username>/<int:post_id>/edit/', views.post_edit, name='post_edit'
+    ),
+    path('group/<slug:slug>/', views.group_posts, name='group_posts'),
+    path('follow/', views.follow_index, name='follow_index'),
+    path(
+        '<str:username>/follow/', views.profile_follow, name='profile_follow'
+    ),
+    path(
+        '<str:username>/unfollow/',
+        views.profile_unfollow,
+        name='profile_unfollow'
+    ),
+    path('<str:username>/', views.profile, name='profile'),
+    path('<str:username>/<int:post_id>/', views.post_view, name='post'),
+    path(
+        '<str:username>/<int:post_id>/comments/',
+        views.post_comments, name='post_comments'
+    ),
+    path(
+        '<str:username>/<int:post_id>/comment/',
+        views.add_comment, name='add_comment'
+    ),
+]
@@ -1,170 +1,208 @@
-from django.conf import settings
-from django.contrib.auth.decorators import login_required
-from django.contrib.auth.models import User
-from django.core.cache import cache
-from django.core.paginator import Paginator
-from django.shortcuts import get_object_or_404, redirect, render
-from django.views.decorators.http import require_GET
-
-from .forms import CommentForm, PostForm
-from .models import Follow, Group, Post
-
-
-@require_GET
-def index(request):
-    post_list = cache.get('index_page')
-    if post_list is None:
-        post_list = Post.objects.all()
-        cache.set('index_page', post_list, timeout=20)
-    paginator = Paginator(post_list, settings.POSTS_FOR_PAGE)
-    page_number = request.GET.get('page')
-    page = paginator.get_page(page_number)
-    return render(
-        request,
-        'index.html',
-        {'page': page}
-    )
-
-
-def group_posts(request, slug):
-    group = get_object_or_404(Group, slug=slug)
-    posts = group.posts_relate.all()
-    paginator = Paginator(posts, settings.POSTS_FOR_PAGE)
-    page_number = request.GET.get('page')
-    page = paginator.get_page(page_number)
-    return render(request, 'group.html', {'group': group, 'page': page})
-
-
-def profile(request, username):
-    author = get_object_or_404(User, username=username)
-    posts = author.posts_relate.all()
-    post = author.posts_relate.first()
-    paginator = Paginator(posts, settings.POSTS_FOR_PAGE)
-    page_number = request.GET.get('page')
-    page = paginator.get_page(page_number)
-    following = False
-    if request.user.is_authenticated and Follow.objects.filter(
-            author_id=author.id,
-            user_id=request.user.id
-    ).exists():
-        following = True
-
-    return render(
-        request,
-        'profile.html',
-        {'page': page,
-         'author': author,
-         'post': post,
-         'following': following,
-         }
-    )
-
-
-def post_view(request, username, post_id):
-    post = get_object_or_404(Post, author__username=username, id=post_id)
-    form = CommentForm(request.POST or None, files=request.FILES or None)
-    comment = post.comments.all()
-    following = False
-    if not request.user.is_anonymous and Follow.objects.filter(
-            author=post.author,
-            user=request.user
-    ).exists():
-        following = True
-    return render(
-        request,
-        'post.html',
-        {'post': post,
-         'author': post.author,
-         'form': form,
-         'comments': comment,
-         'following': following,
-         }
-    )
-
-
-@login_required
-def new_post(request):
-    form = PostForm(request.POST or None, files=request.FILES or None)
-    if form.is_valid():
-        post = form.save(commit=False)
-        post.author = request.user
-        post.save()
-        return redirect('index')
-    return render(request, 'new.html', {'form': form})
-
-
-@login_required
-def post_edit(request, username, post_id):
-    edit_post = get_object_or_404(Post, author__username=username, id=post_id)
-    if request.user.id != edit_post.author.id:
-        return redirect('post', username=username, post_id=post_id)
-    form = PostForm(
-        request.POST or None, files=request.FILES or None, instance=edit_post
-    )
-    if form.is_valid():
-        form.save()
-        return redirect('post', username=username, post_id=post_id)
-    return render(request, 'new.html', {'form': form, 'post': edit_post})
-
-
-@login_required
-def add_comment(request, username, post_id):
-    post = get_object_or_404(
-        Post, author__username=username, id=post_id
-    )
-    form = CommentForm(request.POST or None, files=request.FILES or None)
-    if form.is_valid():
-        comment = form.save(commit=False)
-        comment.author = request.user
-        comment.post = post
-        form.save()
-        return redirect('post', username=username, post_id=post_id)
-    return render(
-        request, 'post.html',
-        {'post': post,
-         'author': post.author,
-         'form': form,
-         }
-    )
-
-
-def page_not_found(request, exception):
-    return render(
-        request,
-        "misc/404.html",
-        {"path": request.path},
-        status=404
-    )
-
-
-def server_error(request):
-    return render(request, "misc/500.html", status=500)
-
-
-@login_required
-def follow_index(request):
-    post_list = Post.objects.filter(author__following__user=request.user)
-    paginator = Paginator(post_list, settings.POSTS_FOR_PAGE)
-    page_number = request.GET.get('page')
-    page = paginator.get_page(page_number)
-    return render(request, "follow.html", {'page': page})
-
-
-@login_required
-def profile_follow(request, username):
-    author = get_object_or_404(User, username=username)
-    user = request.user
-    if author != user and not Follow.objects.filter(
-            user_id=user.id,
-            author_id=author.id
-    ).exists():
-        Follow.objects.create(user_id=user.id, author_id=author.id)
-    return redirect('profile', username)
-
-
-@login_required
-def profile_unfollow(request, username):
-    author = get_object_or_404(User, username=username)
-    user = request.user
-    Follow.objects.filter(user=user, author=author).delete()
-    return redirect('profile', username)
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.contrib.auth.decorators import login_required
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.http import HttpResponse
+from django.shortcuts import get_object_or_404, redirect, render
+from django.views.decorators.http import require_GET
+
+from .caching import get_group, get_index_page
+from .conditional import conditional_page
+from .counters import get_user_stats, group_posts_count
+from .follows import follow_authors, is_following, unfollow_authors
+from .forms import CommentForm, PostForm
+from .metrics import registry
+from .models import Post
+from .paginators import (ElidedPaginator, paginate, paginate_comments,
+                         use_cursor)
+from .search import search_posts
+from .thumbnails import schedule_thumbnail
+from .timeline import timeline_posts
+
+
+@require_GET
+@conditional_page
+def index(request):
+    if use_cursor(request):
+        page = paginate(request, Post.objects.for_feed())
+    else:
+        page = get_index_page(request.GET.get('page'))
+    return render(
+        request,
+        'index.html',
+        {'page': page}
+    )
+
+
+@require_GET
+def search(request):
+    query = request.GET.get('q', '').strip()
+    page = ElidedPaginator(
+        search_posts(query), settings.POSTS_FOR_PAGE
+    ).get_page(request.GET.get('page'))
+    return render(request, 'search.html', {'query': query, 'page': page})
+
+
+@conditional_page
+def group_posts(request, slug):
+    group = get_group(slug)
+    posts = group.posts_relate.for_feed()
+    page = paginate(request, posts, count=group_posts_count(group.pk))
+    return render(request, 'group.html', {'group': group, 'page': page})
+
+
+@conditional_page
+def profile(request, username):
+    author = get_object_or_404(
+        User.objects.select_related('stats'), username=username
+    )
+    posts = author.posts_relate.for_feed()
+    post = author.posts_relate.first()
+    stats = get_user_stats(author)
+    page = paginate(request, posts, count=stats.posts_count)
+    return render(
+        request,
+        'profile.html',
+        {'page': page,
+         'author': author,
+         'stats': stats,
+         'post': post,
+         'following': is_following(request.user, author.id),
+         }
+    )
+
+
+@conditional_page
+def post_view(request, username, post_id):
+    post = get_object_or_404(
+        Post.objects.for_feed().select_related('author__stats'),
+        author__username=username,
+        id=post_id
+    )
+    form = CommentForm(request.POST or None, files=request.FILES or None)
+    return render(
+        request,
+        'post.html',
+        {'post': post,
+         'author': post.author,
+         'stats': get_user_stats(post.author),
+         'form': form,
+         'comments': paginate_comments(post),
+         'following': is_following(request.user, post.author_id),
+         }
+    )
+
+
+@login_required
+def new_post(request):
+    form = PostForm(request.POST or None, files=request.FILES or None)
+    if form.is_valid():
+        post = form.save(commit=False)
+        post.author = request.user
+        # сигналы обновляют счетчики автора в той же транзакции
+        with transaction.atomic():
+            post.save()
+            schedule_thumbnail(post.image)
+        return redirect('index')
+    return render(request, 'new.html', {'form': form})
+
+
+@login_required
+def post_edit(request, username, post_id):
+    edit_post = get_object_or_404(Post, author__username=username, id=post_id)
+    if request.user.id != edit_post.author.id:
+        return redirect('post', username=username, post_id=post_id)
+    form = PostForm(
+        request.POST or None, files=request.FILES or None, instance=edit_post
+    )
+    if form.is_valid():
+        # счетчик комментариев меняется в обход формы, не затираем его
+        post = form.save(commit=False)
+        post.save(update_fields=PostForm.Meta.fields)
+        schedule_thumbnail(post.image)
+        return redirect('post', username=username, post_id=post_id)
+    return render(request, 'new.html', {'form': form, 'post': edit_post})
+
+
+@login_required
+def add_comment(request, username, post_id):
+    post = get_object_or_404(
+        Post.objects.for_feed().select_related('author__stats'),
+        author__username=username,
+        id=post_id
+    )
+    form = CommentForm(request.POST or None, files=request.FILES or None)
+    if form.is_valid():
+        comment = form.save(commit=False)
+        comment.author = request.user
+        comment.post = post
+        with transaction.atomic():
+            form.save()
+        return redirect('post', username=username, post_id=post_id)
+    return render(
+        request, 'post.html',
+        {'post': post,
+         'author': post.author,
+         'stats': get_user_stats(post.author),
+         'form': form,
+         'comments': paginate_comments(post),
+         }
+    )
+
+
+@conditional_page
+def post_comments(request, username, post_id):
+    """ Следующая порция комментариев для кнопки «Показать еще» """
+    post = get_object_or_404(
+        Post.objects.only('id'), author__username=username, id=post_id
+    )
+    return render(
+        request,
+        'includes/comment_list.html',
+        {'comments': paginate_comments(post, request.GET.get('cursor')),
+         'username': username,
+         'post_id': post_id,
+         }
+    )
+
+
+def page_not_found(request, exception):
+    return render(
+        request,
+        "misc/404.html",
+        {"path": request.path},
+        status=404
+    )
+
+
+def server_error(request):
+    return render(request, "misc/500.html", status=500)
+
+
+@login_required
+def follow_index(request):
+    post_list = timeline_posts(request.user)
+    page = paginate(request, post_list)
+    return render(request, "follow.html", {'page': page})
+
+
+@login_required
+def profile_follow(request, username):
+    author = get_object_or_404(User, username=username)
+    follow_authors(request.user, [author])
+    return redirect('profile', username)
+
+
+@login_required
+def profile_unfollow(request, username):
+    author = get_object_or_404(User, username=username)
+    unfollow_authors(request.user, [author.id])
+    return redirect('profile', username)
+
+
+@staff_member_required
+def metrics(request):
+    return HttpResponse(
+        registry.render(), content_type='text/plain; version=0.0.4'
+    )
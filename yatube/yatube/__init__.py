@@ -0,0 +1,8 @@
+import os
+
+
+def settings_module():
+    """ Модуль настроек: YATUBE_ENV=production включает серверные """
+    if os.environ.get('YATUBE_ENV') == 'production':
+        return 'yatube.settings_production'
+    return 'yatube.settings'
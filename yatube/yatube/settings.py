@@ -1,154 +1,233 @@
-"""
-Django settings for yatube project.
-
-Generated by 'django-admin startproject' using Django 2.2.19.
-
-For more information on this file, see
-https://docs.djangoproject.com/en/2.2/topics/settings/
-
-For the full list of settings and their values, see
-https://docs.djangoproject.com/en/2.2/ref/settings/
-"""
-
-import os
-
-# Build paths inside the project like this: os.path.join(BASE_DIR, ...)
-BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-
-# Quick-start development settings - unsuitable for production
-# See https://docs.djangoproject.com/en/2.2/howto/deployment/checklist/
-
-# SECURITY WARNING: keep the secret key used in production secret!
-SECRET_KEY = 'nu=3jl-7hjnchw)5kogm8toxrd&9v##e12n#yxn%d7tdr8huu%'
-
-# SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
-
-ALLOWED_HOSTS = [
-    'localhost',
-    '127.0.0.1',
-    '[::1]',
-    'testserver',
-    'debug_toolbar',
-    'www.andrisres.pythonanywhere.com',
-    'andrisres.pythonanywhere.com',
-]
-
-# Application definition
-
-INSTALLED_APPS = [
-    'posts',
-    'users',
-    'about',
-    'django.contrib.admin',
-    'django.contrib.auth',
-    'django.contrib.contenttypes',
-    'django.contrib.sessions',
-    'django.contrib.messages',
-    'django.contrib.staticfiles',
-    'sorl.thumbnail',
-    'debug_toolbar',
-]
-
-MIDDLEWARE = [
-    'django.middleware.security.SecurityMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
-    'django.middleware.common.CommonMiddleware',
-    'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
-    'django.contrib.messages.middleware.MessageMiddleware',
-    'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    'debug_toolbar.middleware.DebugToolbarMiddleware',
-]
-
-INTERNAL_IPS = [
-    "127.0.0.1",
-]
-
-ROOT_URLCONF = 'yatube.urls'
-
-TEMPLATES_DIR = os.path.join(BASE_DIR, "templates")
-TEMPLATES = [
-    {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
-        'DIRS': [TEMPLATES_DIR],
-        'APP_DIRS': True,
-        'OPTIONS': {
-            'context_processors': [
-                'django.template.context_processors.debug',
-                'django.template.context_processors.request',
-                'django.contrib.auth.context_processors.auth',
-                'django.contrib.messages.context_processors.messages'
-            ],
-        },
-    },
-]
-
-WSGI_APPLICATION = 'yatube.wsgi.application'
-
-# Database
-# https://docs.djangoproject.com/en/2.2/ref/settings/#databases
-
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
-    }
-}
-
-# Password validation
-# https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
-
-AUTH_PASSWORD_VALIDATORS = [
-    {
-        'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
-    },
-    {
-        'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator',
-    },
-    {
-        'NAME': 'django.contrib.auth.password_validation.CommonPasswordValidator',
-    },
-    {
-        'NAME': 'django.contrib.auth.password_validation.NumericPasswordValidator',
-    },
-]
-
-# Internationalization
-# https://docs.djangoproject.com/en/2.2/topics/i18n/
-
-LANGUAGE_CODE = 'en-us'
-
-TIME_ZONE = 'UTC'
-
-USE_I18N = True
-
-USE_L10N = True
-
-USE_TZ = True
-
-# Static files (CSS, JavaScript, Images)
-# https://docs.djangoproject.com/en/2.2/howto/static-files/
-
-# задаём произвольный URL, который будет использоваться для запросов к статическим файлам
-STATIC_URL = "/static/"
-STATIC_ROOT = os.path.join(BASE_DIR, "static")
-
-MEDIA_URL = '/media/'
-MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
-
-LOGIN_URL = "/auth/login/"
-LOGIN_REDIRECT_URL = "index"
-
-EMAIL_BACKEND = "django.core.mail.backends.filebased.EmailBackend"
-EMAIL_FILE_PATH = os.path.join(BASE_DIR, "sent_emails")
-
-# константа для вывода постов через пагинатор
-POSTS_FOR_PAGE = 10
-
-# кэширование
-CACHES = {
-    'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-    }
-}
+"""
+Django settings for yatube project.
+
+Generated by 'django-admin startproject' using Django 2.2.19.
+
+For more information on this file, see
+https://docs.djangoproject.com/en/2.2/topics/settings/
+
+For the full list of settings and their values, see
+https://docs.djangoproject.com/en/2.2/ref/settings/
+"""
+
+import os
+
+# Build paths inside the project like this: os.path.join(BASE_DIR, ...)
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Quick-start development settings - unsuitable for production
+# See https://docs.djangoproject.com/en/2.2/howto/deployment/checklist/
+
+# SECURITY WARNING: keep the secret key used in production secret!
+SECRET_KEY = 'nu=3jl-7hjnchw)5kogm8toxrd&9v##e12n#yxn%d7tdr8huu%'
+
+# SECURITY WARNING: don't run with debug turned on in production!
+DEBUG = True
+
+ALLOWED_HOSTS = [
+    'localhost',
+    '127.0.0.1',
+    '[::1]',
+    'testserver',
+    'debug_toolbar',
+    'www.andrisres.pythonanywhere.com',
+    'andrisres.pythonanywhere.com',
+]
+
+# Application definition
+
+INSTALLED_APPS = [
+    'posts',
+    'users',
+    'about',
+    'api',
+    'benchmarks',
+    'django.contrib.admin',
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    'django.contrib.staticfiles',
+    'sorl.thumbnail',
+    'rest_framework',
+    'debug_toolbar',
+]
+
+MIDDLEWARE = [
+    'posts.middleware.MetricsMiddleware',
+    'django.middleware.security.SecurityMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'debug_toolbar.middleware.DebugToolbarMiddleware',
+]
+
+INTERNAL_IPS = [
+    "127.0.0.1",
+]
+
+ROOT_URLCONF = 'yatube.urls'
+
+TEMPLATES_DIR = os.path.join(BASE_DIR, "templates")
+TEMPLATES = [
+    {
+        # обычный бэкенд Django, который еще замеряет время рендеринга
+        'BACKEND': 'posts.metrics.TimedDjangoTemplates',
+        'DIRS': [TEMPLATES_DIR],
+        'APP_DIRS': True,
+        'OPTIONS': {
+            'context_processors': [
+                'django.template.context_processors.debug',
+                'django.template.context_processors.request',
+                'django.contrib.auth.context_processors.auth',
+                'django.contrib.messages.context_processors.messages'
+            ],
+        },
+    },
+]
+
+WSGI_APPLICATION = 'yatube.wsgi.application'
+
+# Database
+# https://docs.djangoproject.com/en/2.2/ref/settings/#databases
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+    }
+}
+
+# PRAGMA для каждого нового соединения с SQLite (см. settings_production)
+SQLITE_PRAGMAS = {}
+
+# Password validation
+# https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
+
+AUTH_PASSWORD_VALIDATORS = [
+    {
+        'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.CommonPasswordValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.NumericPasswordValidator',
+    },
+]
+
+# Internationalization
+# https://docs.djangoproject.com/en/2.2/topics/i18n/
+
+LANGUAGE_CODE = 'en-us'
+
+TIME_ZONE = 'UTC'
+
+USE_I18N = True
+
+USE_L10N = True
+
+USE_TZ = True
+
+# Static files (CSS, JavaScript, Images)
+# https://docs.djangoproject.com/en/2.2/howto/static-files/
+
+# задаём произвольный URL, который будет использоваться для запросов к статическим файлам
+STATIC_URL = "/static/"
+STATIC_ROOT = os.path.join(BASE_DIR, "static")
+
+MEDIA_URL = '/media/'
+MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+
+LOGIN_URL = "/auth/login/"
+LOGIN_REDIRECT_URL = "index"
+
+EMAIL_BACKEND = "django.core.mail.backends.filebased.EmailBackend"
+EMAIL_FILE_PATH = os.path.join(BASE_DIR, "sent_emails")
+
+# константа для вывода постов через пагинатор
+POSTS_FOR_PAGE = 10
+
+# комментарии под постом показываются порциями, следующие - по кнопке
+COMMENTS_FOR_PAGE = 20
+
+# ссылки на страницы: сколько по краям и вокруг текущей; оценивать ли
+# число постов вместо COUNT(*), когда готового счетчика нет
+PAGE_LINKS_ON_ENDS = 1
+PAGE_LINKS_ON_EACH_SIDE = 2
+POSTS_ESTIMATED_COUNT = True
+
+# 'page' - номера страниц, 'cursor' - курсор по (pub_date, id) для всех лент;
+# курсор можно запросить и для отдельной страницы параметром ?cursor=
+POSTS_PAGINATION = 'page'
+
+# лента подписок: авторам с большим числом подписчиков посты не рассылаются
+# при записи, а подмешиваются при чтении; при подписке в ленту
+# добавляется столько последних постов автора
+TIMELINE_FANOUT_LIMIT = 1000
+TIMELINE_BACKFILL_POSTS = 50
+
+# множество авторов, на которых подписан пользователь, сбрасывается при
+# подписке и отписке; срок - на случай изменений в обход сигналов
+FOLLOWED_AUTHORS_CACHE_TIMEOUT = 60 * 60
+
+# сколько живут закэшированные страницы главной; актуальность
+# обеспечивает сброс версии при изменении постов, комментариев и групп
+INDEX_PAGE_CACHE_TIMEOUT = 60 * 15
+
+# сколько хранить группу по slug и число ее постов
+GROUP_CACHE_TIMEOUT = 60 * 60
+
+# миниатюры картинок постов создаются заранее: после загрузки, когда ответ
+# уже отдан, или командой pregenerate_thumbnails; страницы только читают
+# готовый URL из KV-хранилища sorl
+POST_THUMBNAIL_GEOMETRY = '960x339'
+POST_THUMBNAIL_OPTIONS = {'crop': 'center', 'upscale': True}
+
+# сколько картинок обрабатывает процесс после ответа на один запрос
+THUMBNAILS_PER_REQUEST = 2
+
+# адаптивные варианты картинки поста для srcset: ширины, опции WebP,
+# ширина картинки на странице и сколько хранить найденные варианты
+POST_IMAGE_WIDTHS = (320, 640, 960)
+POST_IMAGE_WEBP_OPTIONS = {'format': 'WEBP', 'quality': 80}
+POST_IMAGE_SIZES = '(max-width: 992px) 100vw, 960px'
+POST_IMAGE_VARIANTS_CACHE_TIMEOUT = 60 * 60 * 24
+
+# ограничения загружаемых картинок, проверяются по заголовку файла
+POST_IMAGE_FORMATS = ('JPEG', 'PNG', 'GIF', 'WEBP')
+POST_IMAGE_MAX_BYTES = 10 * 1024 * 1024
+POST_IMAGE_MAX_SIDE = 8000
+POST_IMAGE_MAX_PIXELS = 24 * 1000 * 1000
+
+# сколько авторов можно передать в одном запросе массовой подписки
+FOLLOW_BULK_LIMIT = 400
+
+# API отдает JSON без HTML-обертки
+REST_FRAMEWORK = {
+    'DEFAULT_RENDERER_CLASSES': ['rest_framework.renderers.JSONRenderer'],
+}
+
+# бюджеты представлений по имени URL: при превышении числа SQL-запросов
+# или времени ответа в лог пишется предупреждение
+VIEW_BUDGETS = {
+    'index': {'queries': 5, 'seconds': 0.25},
+    'group_posts': {'queries': 6, 'seconds': 0.25},
+    'profile': {'queries': 8, 'seconds': 0.25},
+    'post': {'queries': 8, 'seconds': 0.25},
+    'follow_index': {'queries': 6, 'seconds': 0.25},
+}
+
+# кэширование
+CACHES = {
+    'default': {
+        # LocMemCache, который считает попадания и промахи для /metrics/
+        'BACKEND': 'posts.metrics.CountingLocMemCache',
+    }
+}
@@ -0,0 +1,79 @@
+"""
+Настройки для работы на сервере.
+
+Включаются переменной окружения YATUBE_ENV=production (или напрямую
+через DJANGO_SETTINGS_MODULE=yatube.settings_production).
+"""
+
+import copy
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+from .settings import *  # noqa: F401,F403
+from .settings import BASE_DIR, INSTALLED_APPS, MIDDLEWARE, TEMPLATES
+
+DEBUG = False
+
+# ключ из settings.py лежит в репозитории: на сервере без своего не стартуем
+SECRET_KEY = (
+    os.environ.get('DJANGO_SECRET_KEY') or os.environ.get('SECRET_KEY')
+)
+if not SECRET_KEY:
+    raise ImproperlyConfigured(
+        'Задайте секретный ключ в переменной окружения DJANGO_SECRET_KEY'
+    )
+
+# отладочная панель не нужна и не должна даже импортироваться
+INSTALLED_APPS = [app for app in INSTALLED_APPS if app != 'debug_toolbar']
+MIDDLEWARE = [
+    middleware for middleware in MIDDLEWARE
+    if not middleware.startswith('debug_toolbar.')
+]
+
+# шаблоны компилируются один раз на процесс
+TEMPLATES = copy.deepcopy(TEMPLATES)
+TEMPLATES[0]['APP_DIRS'] = False
+TEMPLATES[0]['OPTIONS']['loaders'] = [
+    ('django.template.loaders.cached.Loader', [
+        'django.template.loaders.filesystem.Loader',
+        'django.template.loaders.app_directories.Loader',
+    ]),
+]
+
+# соединение с базой живет между запросами
+CONN_MAX_AGE = 60
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        'CONN_MAX_AGE': CONN_MAX_AGE,
+        'OPTIONS': {'timeout': 20},
+    }
+}
+
+# кэш в файле, общий для всех процессов: сброс версии виден сразу везде
+CACHES = {
+    'default': {
+        'BACKEND': 'posts.metrics.CountingSQLiteCache',
+        'LOCATION': os.environ.get(
+            'YATUBE_CACHE_PATH', os.path.join(BASE_DIR, 'cache.sqlite3')
+        ),
+        'TIMEOUT': 300,
+        'OPTIONS': {
+            'MAX_ENTRIES': 50000,
+            'MAX_BYTES': 256 * 1024 * 1024,
+        },
+    }
+}
+
+# WAL: читатели не ждут писателя; остальное - меньше fsync и больше кэша
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    'cache_size': -20000,
+    'temp_store': 'MEMORY',
+    'mmap_size': 128 * 1024 * 1024,
+}